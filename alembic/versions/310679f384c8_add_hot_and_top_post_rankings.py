@@ -0,0 +1,61 @@
+"""add hot and top post rankings
+
+Revision ID: 310679f384c8
+Revises: 373733f7ef47
+Create Date: 2026-10-17 07:24:11.482193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '310679f384c8'
+down_revision: Union[str, Sequence[str], None] = '373733f7ef47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing votes get their post's creation time: the earliest they can have been cast
+    op.add_column('votes', sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.execute("UPDATE votes SET created_at = posts.created_at FROM posts WHERE posts.id = votes.post_id")
+    op.alter_column('votes', 'created_at', nullable=False, server_default=sa.text('now()'))
+    op.add_column('posts', sa.Column(
+        'hot_score',
+        sa.Float(),
+        server_default=sa.text('extract(epoch from now()) / 45000'),
+        nullable=False
+    ))
+    op.execute("UPDATE posts SET hot_score = log(greatest(vote_count, 1)) + extract(epoch from created_at) / 45000")
+    op.create_index('ix_posts_hot_score_id', 'posts', ['hot_score', 'id'], unique=False)
+    op.create_table(
+        'post_vote_hours',
+        sa.Column('post_id', sa.Integer(), nullable=False),
+        sa.Column('hour', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('votes', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('post_id', 'hour')
+    )
+    op.create_index('ix_post_vote_hours_hour', 'post_vote_hours', ['hour', 'post_id', 'votes'], unique=False)
+    # Backfill the buckets the top rankings can still read
+    op.execute(
+        """
+        INSERT INTO post_vote_hours (post_id, hour, votes)
+        SELECT post_id, date_trunc('hour', created_at, 'UTC'), count(*)
+        FROM votes WHERE created_at >= now() - interval '30 days'
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_post_vote_hours_hour', table_name='post_vote_hours')
+    op.drop_table('post_vote_hours')
+    op.drop_index('ix_posts_hot_score_id', table_name='posts')
+    op.drop_column('posts', 'hot_score')
+    op.drop_column('votes', 'created_at')
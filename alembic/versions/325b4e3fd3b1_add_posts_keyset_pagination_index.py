@@ -0,0 +1,28 @@
+"""add posts keyset pagination index
+
+Revision ID: 325b4e3fd3b1
+Revises: e0661c2399bd
+Create Date: 2026-10-17 06:42:55.261847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '325b4e3fd3b1'
+down_revision: Union[str, Sequence[str], None] = 'e0661c2399bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
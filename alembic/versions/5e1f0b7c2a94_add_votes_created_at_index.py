@@ -0,0 +1,28 @@
+"""add votes created_at index
+
+Revision ID: 5e1f0b7c2a94
+Revises: 310679f384c8
+Create Date: 2026-10-17 09:12:40.318562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1f0b7c2a94'
+down_revision: Union[str, Sequence[str], None] = '310679f384c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_votes_created_at', 'votes', ['created_at', 'user_id', 'post_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_votes_created_at', table_name='votes')
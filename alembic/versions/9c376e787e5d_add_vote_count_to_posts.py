@@ -0,0 +1,38 @@
+"""add vote_count to posts
+
+Revision ID: 9c376e787e5d
+Revises: 325b4e3fd3b1
+Create Date: 2026-10-17 06:43:58.306107
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c376e787e5d'
+down_revision: Union[str, Sequence[str], None] = '325b4e3fd3b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('vote_count', sa.Integer(), server_default='0', nullable=False))
+    # Backfill counters from existing votes
+    op.execute(
+        """
+        UPDATE posts SET vote_count = counts.total
+        FROM (SELECT post_id, count(*) AS total FROM votes GROUP BY post_id) AS counts
+        WHERE posts.id = counts.post_id
+        """
+    )
+    op.create_index('ix_posts_vote_count_id', 'posts', ['vote_count', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_vote_count_id', table_name='posts')
+    op.drop_column('posts', 'vote_count')
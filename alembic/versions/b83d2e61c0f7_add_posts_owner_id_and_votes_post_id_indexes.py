@@ -0,0 +1,34 @@
+"""add posts owner_id and votes post_id indexes
+
+Revision ID: b83d2e61c0f7
+Revises: 5e1f0b7c2a94
+Create Date: 2026-10-17 11:03:27.904215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83d2e61c0f7'
+down_revision: Union[str, Sequence[str], None] = '5e1f0b7c2a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build without blocking writes; CONCURRENTLY cannot run inside a transaction.
+    # A failed build leaves an INVALID index behind: drop it and rerun the upgrade.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_posts_owner_id', 'posts', ['owner_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_votes_post_id', 'votes', ['post_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_votes_post_id', table_name='votes', postgresql_concurrently=True)
+        op.drop_index('ix_posts_owner_id', table_name='posts', postgresql_concurrently=True)
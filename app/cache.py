@@ -0,0 +1,294 @@
+from app.config import Lazy, settings
+from collections import OrderedDict
+from fastapi import Request, Response, status
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+import asyncio
+import hashlib
+import itertools
+import threading
+import time
+
+# In-process caches
+class TTLCache:
+    """
+    Bounded, thread-safe LRU cache whose entries expire after a time-to-live.
+    A `maxsize` of 0 disables caching entirely.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return a live entry and mark it most recently used.
+        Args:
+            key (Hashable): Cache key.
+            default (Any): Value returned on a miss or an expired entry.
+        Returns:
+            Any: Cached value or `default`.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        """
+        Store a value, evicting the least recently used entry when full.
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to cache.
+            expires_at (float): Optional `time.monotonic()` deadline, capped at the cache TTL.
+        """
+        if self.maxsize <= 0:
+            return
+        deadline = time.monotonic() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._entries[key] = (value, deadline)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Report cache size and effectiveness.
+        Returns:
+            dict: Current size, capacity, hit and miss counters and hit ratio.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+# Response cache backends
+class MemoryBackend:
+    """
+    Per-process response cache backend built on the bounded LRU `TTLCache`.
+    Invalidation only reaches this process: other workers keep serving their own
+    entries until they expire, so they may be up to `ttl` seconds stale.
+    Namespace versions are bounded like the entries. Versions are never reused:
+    a namespace bumped or seen again after its version was evicted gets a new one,
+    so an evicted version can only cost misses, never serve a stale entry.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize, ttl)
+        self._versions = TTLCache(maxsize, ttl)
+        self._next_version = itertools.count(1)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self.entries.set(key, value)
+
+    async def get_versions(self, namespaces: List[str]) -> List[int]:
+        versions = []
+        for namespace in namespaces:
+            version = self._versions.get(namespace)
+            if version is None:
+                version = next(self._next_version)
+                self._versions.set(namespace, version)
+            versions.append(version)
+        return versions
+
+    async def bump(self, namespaces: Iterable[str]):
+        for namespace in namespaces:
+            self._versions.set(namespace, next(self._next_version))
+
+    async def clear(self):
+        self.entries.clear()
+        self._versions.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self.entries._entries)
+
+class RedisBackend:
+    """
+    Response cache backend on any Redis-protocol server, shared by all workers.
+    Namespace versions are plain counters bumped with INCR; superseded entries
+    are never deleted and simply expire through their TTL.
+    """
+    def __init__(self, client, ttl: float, prefix: str = "chirp:cache:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes):
+        await self.client.set(self.prefix + key, value, px=int(self.ttl * 1000))
+
+    async def get_versions(self, namespaces: List[str]) -> List[int]:
+        versions = await self.client.mget([f"{self.prefix}version:{namespace}" for namespace in namespaces])
+        return [int(version or 0) for version in versions]
+
+    async def bump(self, namespaces: Iterable[str]):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                pipe.incr(f"{self.prefix}version:{namespace}")
+            await pipe.execute()
+
+    async def clear(self):
+        keys = [key async for key in self.client.scan_iter(match=f"{self.prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+    def size(self) -> Optional[int]:
+        return None
+
+class ResponseCache:
+    """
+    Cache of serialized response bodies with versioned invalidation.
+    Every entry key embeds the current version of the namespaces it depends on
+    ("posts" for listings, "post:<id>" for a single post); writers bump those
+    versions, so stale entries are never read again, including ones filled by a
+    load that raced with the write. Concurrent misses for the same key in this
+    process share a single load (single-flight); if the request running it is
+    cancelled, the requests that joined it load again. A `None` backend disables caching.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_load(self, namespaces: List[str], key: str, loader: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+        Return the cached body for `key`, or load, store and return it.
+        Args:
+            namespaces (List[str]): Namespaces whose writes invalidate this entry.
+            key (str): Entry key built from the request parameters.
+            loader (Callable): Coroutine function producing the serialized body.
+        Returns:
+            bytes: The response body.
+        """
+        if self.backend is None:
+            return await loader()
+        versions = await self.backend.get_versions(namespaces)
+        key = key + "|" + ",".join(f"{namespace}@{version}" for namespace, version in zip(namespaces, versions))
+        body = await self.backend.get(key)
+        if body is not None:
+            self.hits += 1
+            return body
+        self.misses += 1
+        # Join a load already running for this key instead of querying again
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Only retry when the leading request was cancelled, not this one
+                if not inflight.cancelled():
+                    raise
+        future = asyncio.get_running_loop().create_future()
+        # Consume the exception when nobody joined, so it is not logged as unretrieved
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = future
+        try:
+            body = await loader()
+            await self.backend.set(key, body)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(body)
+            return body
+        finally:
+            del self._inflight[key]
+
+    async def invalidate(self, *namespaces: str):
+        """Bump the given namespaces so every entry depending on them is bypassed."""
+        if self.backend is not None:
+            await self.backend.bump(namespaces)
+
+    async def clear(self):
+        """Drop all entries and versions and reset the hit/miss counters."""
+        if self.backend is not None:
+            await self.backend.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Report cache effectiveness; size and capacity are only known for the memory backend.
+        Returns:
+            dict: Current size, capacity, hit and miss counters and hit ratio.
+        """
+        lookups = self.hits + self.misses
+        memory = isinstance(self.backend, MemoryBackend)
+        return {
+            "size": self.backend.size() if memory else None,
+            "maxsize": self.backend.entries.maxsize if memory else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+def etag_response(request: Request, body: bytes) -> Response:
+    """
+    Wrap a serialized JSON body in a response carrying a strong ETag.
+    Args:
+        request (Request): The incoming request, checked for `If-None-Match`.
+        body (bytes): The serialized JSON body.
+    Returns:
+        Response: 304 Not Modified if the client already holds this body, else 200 with the body.
+    """
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+def _response_cache_backend():
+    """
+    Build the response cache backend selected by `settings.response_cache_backend`.
+    Raises:
+        RuntimeError: If the redis backend is selected but the redis package is missing.
+    Returns:
+        MemoryBackend | RedisBackend | None: The backend, or None when caching is disabled.
+    """
+    if settings.response_cache_backend == "memory":
+        return MemoryBackend(settings.response_cache_size, settings.response_cache_ttl_seconds)
+    if settings.response_cache_backend == "redis":
+        try:
+            from redis.asyncio import Redis
+        except ImportError as error:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package") from error
+        return RedisBackend(Redis.from_url(settings.response_cache_redis_url), settings.response_cache_ttl_seconds)
+    return None
+
+# Shared cache of serialized post responses
+response_cache = Lazy(lambda: ResponseCache(_response_cache_backend()))
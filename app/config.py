@@ -1,4 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Any, Callable, List, Literal, Optional
+import threading
 
 class Settings(BaseSettings):
     """
@@ -10,12 +12,125 @@ class Settings(BaseSettings):
     db_name: str
     db_user: str
     db_password: str
+    # Use the asyncpg driver; False falls back to psycopg2 on the threadpool
+    db_async: bool = True
+    # Connection pool settings ("null" opens a connection per checkout,
+    # "pgbouncer" also disables asyncpg prepared statement caching for transaction poolers)
+    db_pool_mode: Literal["queue", "null", "pgbouncer"] = "queue"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    # Argon2 password hashing parameters and the bounded worker pool running it
+    password_hash_time_cost: int = 3
+    password_hash_memory_cost: int = 65536
+    password_hash_parallelism: int = 4
+    password_hash_workers: int = 2
+    password_hash_queue_limit: int = 32
     # JWT settings
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
+    # Authenticated-user cache (size 0 disables it); trusting the token skips the user lookup entirely
+    user_cache_size: int = 10000
+    # Verified-token cache; entries never outlive the token's own exp claim
+    token_cache_size: int = 10000
+    token_cache_ttl_seconds: float = 300.0
+    user_cache_ttl_seconds: float = 60.0
+    auth_trust_token: bool = False
+    # Response cache for post reads ("memory" is per process, "redis" is shared by all workers)
+    response_cache_backend: Literal["memory", "redis", "none"] = "memory"
+    response_cache_size: int = 1000
+    response_cache_ttl_seconds: float = 30.0
+    response_cache_redis_url: str = "redis://localhost:6379/0"
+    # Rate limits per route policy as "<count>/<second|minute|hour>" (empty disables one); "memory"
+    # limits each worker separately (tracking at most RATE_LIMIT_MEMORY_SIZE clients), "redis" all workers together
+    rate_limit_backend: Literal["memory", "redis", "none"] = "memory"
+    rate_limit_memory_size: int = 100000
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    # Keyed on the client IP, so off until FORWARDED_ALLOW_IPS trusts the proxy in front of the app
+    rate_limit_login: str = ""
+    rate_limit_vote: str = "30/second"
+    rate_limit_search: str = "60/minute"
+    # Maximum number of post ids a bulk post read may request
+    post_batch_max_ids: int = 100
+    # Maximum number of posts a bulk post creation may submit
+    post_bulk_max_items: int = 1000
+    # Rows fetched from the server-side cursor per chunk of a streamed export
+    export_batch_size: int = 1000
+    # Ids of the operator/analytics users allowed to download exports, as a JSON list (e.g. [1, 2]); empty allows no one
+    export_user_ids: List[int] = []
+    # Write-behind voting groups single votes arriving within the window into one transaction
+    vote_write_behind: bool = False
+    vote_write_behind_window_seconds: float = 0.005
+    vote_write_behind_max_size: int = 100
+    # Per-request query counts (Server-Timing header) and slow query logging; disabled it adds no hooks
+    query_stats_enabled: bool = False
+    slow_query_threshold_ms: float = 100.0
+    # Readiness probe: background database check interval and timeout, and failures in a row before unready
+    health_check_interval_seconds: float = 10.0
+    health_check_timeout_seconds: float = 2.0
+    health_check_failure_threshold: int = 3
     # Pydantic configuration to read from .env file
     model_config = SettingsConfigDict(env_file=".env")
 
-# Instantiate settings to be imported throughout the app
-settings = Settings()
\ No newline at end of file
+# Lazily built module-level singletons
+_UNSET = object()
+
+class Lazy:
+    """
+    Proxy to a module-level object built on first use, typically from `settings`.
+    Attribute reads and writes go to the built object, so modules can import the
+    proxy at any time without reading the environment or creating anything;
+    `configure` drops every built object so the next use rebuilds it, passing
+    it to `dispose` (if given) to release its resources.
+    """
+    _instances: List["Lazy"] = []
+
+    def __init__(self, factory: Callable[[], Any], dispose: Optional[Callable[[Any], None]] = None):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_dispose", dispose)
+        object.__setattr__(self, "_target", _UNSET)
+        # One lock per proxy: factories resolve other proxies (usually `settings`) while building
+        object.__setattr__(self, "_lock", threading.Lock())
+        Lazy._instances.append(self)
+
+    def _resolve(self) -> Any:
+        """Return the proxied object, building it on first use."""
+        target = self._target
+        if target is _UNSET:
+            with self._lock:
+                target = self._target
+                if target is _UNSET:
+                    target = self._factory()
+                    object.__setattr__(self, "_target", target)
+        return target
+
+    def _reset(self, target: Any = _UNSET):
+        """Replace the proxied object, or drop it so the next use builds it again."""
+        previous = self._target
+        object.__setattr__(self, "_target", target)
+        if self._dispose is not None and previous is not _UNSET:
+            self._dispose(previous)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._resolve(), name, value)
+
+# Settings shared throughout the app, read from the environment on first use
+settings: Settings = Lazy(Settings)
+
+def configure(new_settings: Settings):
+    """
+    Make `new_settings` the settings of the app.
+    Every `Lazy` singleton built from the previous settings (engines, caches,
+    password hasher, ...) is dropped and rebuilt from the new ones on next use.
+    Args:
+        new_settings (Settings): The settings to apply.
+    """
+    for instance in Lazy._instances:
+        instance._reset()
+    settings._reset(new_settings)
\ No newline at end of file
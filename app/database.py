@@ -1,29 +1,217 @@
-from app.config import settings
-from sqlalchemy import create_engine
+from app.config import Lazy, settings
+from app.pool import pool_status, TimedAsyncAdaptedQueuePool, TimedNullPool, TimedQueuePool
+from app.query_stats import QueryInstrumentation
+from fastapi.concurrency import run_in_threadpool
+from functools import cached_property
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from uuid import uuid4
 
-# Construct the database URL from environment settings
-SQLALCHEMY_DATABASE_URL = (
-    f"postgresql://{settings.db_user}:{settings.db_password}"
-    f"@{settings.db_host}:{settings.db_port}/{settings.db_name}"
+def _pool_options(async_driver: bool) -> dict:
+    """
+    Build engine pool arguments from the connection pool settings.
+    Size workers so that workers * (db_pool_size + db_max_overflow) stays below
+    the server's max_connections, or use a "null"/"pgbouncer" pool behind a pooler.
+    Args:
+        async_driver (bool): True for the asyncpg engine, False for psycopg2.
+    Returns:
+        dict: Keyword arguments for create_engine / create_async_engine.
+    """
+    if settings.db_pool_mode == "queue":
+        return {
+            "poolclass": TimedAsyncAdaptedQueuePool if async_driver else TimedQueuePool,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+            "pool_recycle": settings.db_pool_recycle,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+        }
+    options = {"poolclass": TimedNullPool}
+    if settings.db_pool_mode == "pgbouncer" and async_driver:
+        # Transaction poolers hand each transaction to any server connection,
+        # so named prepared statements must be unique and never cached
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return options
+
+# Statement counting and slow query logging, hooked into the engines only when enabled
+query_instrumentation = Lazy(
+    lambda: QueryInstrumentation(settings.slow_query_threshold_ms / 1000, enabled=settings.query_stats_enabled)
 )
 
-# Create SQLAlchemy engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+class Engines:
+    """
+    SQLAlchemy engines (psycopg2 for the sync path, asyncpg for the async path) and
+    their session factories, each created on first use. Processes only pay for the
+    driver they use, and creating an engine opens no connection, so engines built
+    before a fork (e.g. in a preloading gunicorn master) are safe to inherit.
+    """
+    @cached_property
+    def SQLALCHEMY_DATABASE_URL(self) -> str:
+        return (
+            f"postgresql://{settings.db_user}:{settings.db_password}"
+            f"@{settings.db_host}:{settings.db_port}/{settings.db_name}"
+        )
+
+    @cached_property
+    def SQLALCHEMY_ASYNC_DATABASE_URL(self) -> str:
+        return self.SQLALCHEMY_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    @cached_property
+    def engine(self):
+        engine = create_engine(self.SQLALCHEMY_DATABASE_URL, **_pool_options(async_driver=False))
+        if settings.query_stats_enabled:
+            query_instrumentation.instrument(engine)
+        return engine
+
+    @cached_property
+    def async_engine(self):
+        async_engine = create_async_engine(self.SQLALCHEMY_ASYNC_DATABASE_URL, **_pool_options(async_driver=True))
+        if settings.query_stats_enabled:
+            query_instrumentation.instrument(async_engine.sync_engine)
+        return async_engine
+
+    @cached_property
+    def SessionLocal(self):
+        return sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    @cached_property
+    def AsyncSessionLocal(self):
+        return async_sessionmaker(bind=self.async_engine, autoflush=False, expire_on_commit=False)
+
+    @property
+    def route_engine(self):
+        """The engine behind the routes' database dependency, as selected by `settings.db_async`."""
+        return self.async_engine if settings.db_async else self.engine
 
-# Session factory for interacting with the database
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async def dispose(self):
+        """Close the pooled connections of the engines created so far."""
+        if "engine" in self.__dict__:
+            self.engine.dispose()
+        if "async_engine" in self.__dict__:
+            await self.async_engine.dispose()
+
+engines = Lazy(Engines)
+
+def __getattr__(name: str):
+    """Serve the engines, session factories and URLs of `engines` as module attributes, created on first use."""
+    if name in ("engine", "async_engine", "SessionLocal", "AsyncSessionLocal", "SQLALCHEMY_DATABASE_URL", "SQLALCHEMY_ASYNC_DATABASE_URL"):
+        return getattr(engines, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Base class for declarative models
 Base = declarative_base()
 
+def get_pool_status() -> dict:
+    """
+    Report usage of the connection pool behind the routes' database dependency.
+    Returns:
+        dict: Pool mode, capacity, saturation and checkout wait statistics.
+    """
+    return pool_status(engines.route_engine.pool, settings.db_max_overflow)
+
+async def ping_database():
+    """
+    Run `SELECT 1` on the engine selected by `settings.db_async`.
+    Raises:
+        Exception: Any driver or pool error if the database is unreachable.
+    """
+    if settings.db_async:
+        async with engines.async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    else:
+        def ping():
+            with engines.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        await run_in_threadpool(ping)
+
 def get_db():
     """
-    Dependency for FastAPI routes.
+    Dependency for synchronous code (CLI tools, maintenance commands).
     Yields a database session and ensures it is closed after use.
     """
-    db = SessionLocal()
+    db = engines.SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+class SyncStreamResult:
+    """Awaitable AsyncResult-style facade over a streamed synchronous Result."""
+    def __init__(self, result):
+        self.result = result
+
+    async def partitions(self, size=None):
+        """Yield lists of rows, fetching each one from the server-side cursor on the threadpool."""
+        partitions = self.result.partitions(size)
+        while (rows := await run_in_threadpool(next, partitions, None)) is not None:
+            yield rows
+
+class SyncSessionAdapter:
+    """
+    Awaitable AsyncSession-style facade over a synchronous Session.
+    Every database call runs on the threadpool, so routers keep a single
+    `async def` code path whichever driver `settings.db_async` selects.
+    """
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def stream(self, statement, *args, **kwargs):
+        statement = statement.execution_options(stream_results=True)
+        return SyncStreamResult(await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs))
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+async def get_async_db():
+    """
+    Dependency for FastAPI routes.
+    Yields an AsyncSession on the asyncpg engine, or a SyncSessionAdapter over the
+    psycopg2 engine when `settings.db_async` is False, and closes it after use.
+    """
+    if settings.db_async:
+        async with engines.AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SyncSessionAdapter(engines.SessionLocal(expire_on_commit=False))
+        try:
+            yield db
+        finally:
+            await db.close()
@@ -0,0 +1,96 @@
+from app.config import Lazy, settings
+from app.database import ping_database
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Background readiness checks
+class HealthMonitor:
+    """
+    Runs a connectivity check on an interval so readiness probes can be served
+    from memory instead of taking a pool connection each time. The service is
+    ready after a successful check and turns unready after `failure_threshold`
+    consecutive failures (a check that exceeds `timeout` counts as failed).
+    """
+    def __init__(self, check: Callable[[], Awaitable[None]], interval: float, timeout: float, failure_threshold: int):
+        self.check = check
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.ready = False
+        self.consecutive_failures = 0
+        self.last_checked_at: Optional[datetime] = None
+        self.last_latency_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def check_once(self):
+        """Run one check and update the readiness state."""
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.check(), self.timeout)
+        except Exception as error:
+            self.consecutive_failures += 1
+            self.last_error = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+            if self.ready and self.consecutive_failures >= self.failure_threshold:
+                logger.warning("Readiness check failed %d times in a row: %s", self.consecutive_failures, self.last_error)
+                self.ready = False
+        else:
+            self.consecutive_failures = 0
+            self.last_error = None
+            self.ready = True
+        self.last_latency_seconds = time.perf_counter() - start
+        self.last_checked_at = datetime.now(timezone.utc)
+
+    async def _run(self):
+        while True:
+            await self.check_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start checking in the background on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background checks."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        """
+        Report the outcome of the latest check.
+        Returns:
+            dict: Readiness, database status, check time and latency, consecutive failures and last error.
+        """
+        if self.last_checked_at is None:
+            database = "unknown"
+        else:
+            database = "connected" if self.consecutive_failures == 0 else "unreachable"
+        return {
+            "status": "ready" if self.ready else "unready",
+            "database": database,
+            "last_checked_at": self.last_checked_at,
+            "last_check_latency_ms": (
+                round(self.last_latency_seconds * 1000, 3) if self.last_latency_seconds is not None else None
+            ),
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
+
+# Shared monitor of database connectivity, started with the application
+health_monitor = Lazy(lambda: HealthMonitor(
+    ping_database,
+    interval=settings.health_check_interval_seconds,
+    timeout=settings.health_check_timeout_seconds,
+    failure_threshold=settings.health_check_failure_threshold,
+))
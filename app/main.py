@@ -1,41 +1,43 @@
 from app import schemas
-from app.database import get_db
-from app.routers import auth, post, user, vote
+from app.cache import response_cache
+from app.config import configure, Settings
+from app.database import engines, get_async_db, get_pool_status, query_instrumentation
+from app.health import health_monitor
+from app.metrics import metrics_response, MetricsMiddleware
+from app.oauth2 import token_cache, user_cache
+from app.query_stats import QueryStatsMiddleware
+from app.ratelimit import RateLimitMiddleware
+from app.routers import auth, export, post, user, vote
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
-from sqlalchemy.orm import Session
-
-# FastAPI app initialization
-app = FastAPI(title="Chirp API", version="1.0.0")
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 # Track application start time for uptime calculation
 START_TIME = datetime.now(timezone.utc)
 
-# CORS middleware setup
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"], # In production, restrict this to allowed origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Application lifespan
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the background readiness checks while the application is up, and close the pools on shutdown."""
+    health_monitor.start()
+    yield
+    await health_monitor.stop()
+    await engines.dispose()
 
-# Routers
-app.include_router(auth.router)
-app.include_router(user.router)
-app.include_router(post.router)
-app.include_router(vote.router)
+# Health and metrics endpoints
+router = APIRouter(tags=["Health Check"])
 
 # Health check endpoint
-@app.get(
+@router.get(
     "/health",
-    tags=["Health Check"],
     status_code=status.HTTP_200_OK,
     response_model=schemas.HealthStatus,
 )
-def health_check(db: Session = Depends(get_db)):
+async def health_check(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Health endpoint for readiness and liveness probes.
     Returns:
@@ -43,12 +45,14 @@ def health_check(db: Session = Depends(get_db)):
         uptime_seconds: time since app start
         version: API version
         database: connection status
+        pool: connection pool saturation and checkout wait statistics
+        caches: size and hit/miss counters of the auth and response caches
     Raises:
         HTTPException: 503 if database is unreachable
     """
     # Check database connectivity
     try:
-        db.execute(text('SELECT 1;'))
+        await db.execute(text('SELECT 1;'))
         db_status = schemas.DatabaseStatus.connected
     except Exception:
         db_status = schemas.DatabaseStatus.unreachable
@@ -59,6 +63,113 @@ def health_check(db: Session = Depends(get_db)):
     return {
         "status": "ok",
         "uptime_seconds": uptime_seconds,
-        "version": app.version,
+        "version": request.app.version,
         "database": db_status,
-    }
\ No newline at end of file
+        "pool": get_pool_status(),
+        "caches": {
+            "users": user_cache.stats(),
+            "tokens": token_cache.stats(),
+            "responses": response_cache.stats(),
+        },
+    }
+
+# Liveness probe
+@router.get(
+    "/health/live",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.LivenessStatus,
+)
+async def liveness(request: Request):
+    """
+    Liveness probe: answers as long as the process serves requests.
+    Never touches the database, so it is safe to probe aggressively.
+    Returns:
+        status: API status
+        uptime_seconds: time since app start
+        version: API version
+    """
+    uptime_seconds = int((datetime.now(timezone.utc) - START_TIME).total_seconds())
+    return {"status": "ok", "uptime_seconds": uptime_seconds, "version": request.app.version}
+
+# Readiness probe
+@router.get(
+    "/health/ready",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.ReadinessStatus,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": schemas.ReadinessStatus}},
+)
+async def readiness(response: Response):
+    """
+    Readiness probe served from the background database check, without a pool checkout.
+    Returns:
+        status: "ready", or "unready" with 503 until the first successful check
+            and after HEALTH_CHECK_FAILURE_THRESHOLD consecutive failures
+        database: result of the latest check
+        last_checked_at: time of the latest check
+        last_check_latency_ms: duration of the latest check
+        consecutive_failures: failed checks since the last success
+        last_error: error of the latest failed check
+        pool: connection pool saturation and checkout wait statistics
+    """
+    readiness_status = health_monitor.status()
+    if not health_monitor.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {**readiness_status, "pool": get_pool_status()}
+
+# Prometheus metrics endpoint
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Metrics in the Prometheus text exposition format.
+    Returns:
+        Response: Request counts and latency histograms per route, in-flight requests,
+        connection pool, cache and password-hash queue figures of every worker.
+    """
+    return metrics_response()
+
+# Application factory
+def create_app(app_settings: Optional[Settings] = None) -> FastAPI:
+    """
+    Build the Chirp application.
+    Reads no settings and creates no engine, cache or hasher: those are built from
+    the settings on first use, so a preloading gunicorn master can import and build
+    the app before its workers fork.
+    Args:
+        app_settings (Settings): Settings to run with, replacing the ones read from the
+            environment and `.env`; objects built from the previous settings are dropped.
+    Returns:
+        FastAPI: The application with its middleware and routers.
+    """
+    if app_settings is not None:
+        configure(app_settings)
+    app = FastAPI(title="Chirp API", version="1.0.0", lifespan=lifespan)
+
+    # Rate limiting, wrapped by CORS so browsers can read the 429 responses
+    app.add_middleware(RateLimitMiddleware)
+
+    # CORS middleware setup
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"], # In production, restrict this to allowed origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Request metrics for /metrics
+    app.add_middleware(MetricsMiddleware)
+
+    # Per-request query statistics (a pass-through unless QUERY_STATS_ENABLED is set)
+    app.add_middleware(QueryStatsMiddleware, instrumentation=query_instrumentation)
+
+    # Routers
+    app.include_router(auth.router)
+    app.include_router(user.router)
+    app.include_router(post.router)
+    app.include_router(vote.router)
+    app.include_router(export.router)
+    app.include_router(router)
+    return app
+
+# Application served by `uvicorn app.main:app` and `gunicorn app.main:app`
+app = create_app()
@@ -0,0 +1,64 @@
+from app import models
+from app.database import SessionLocal
+from app.ranking import hot_score, VOTE_HOURS_RETENTION
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+import argparse
+
+# Consistency repair for denormalized data
+def repair_vote_counts(db: Session) -> int:
+    """
+    Recompute `posts.vote_count` (and with it `hot_score`) from the `votes` table and fix any drift.
+    Drift can appear when votes disappear outside the vote endpoint,
+    e.g. through `ON DELETE CASCADE` when a user is removed.
+    Args:
+        db (Session): SQLAlchemy session used for the repair.
+    Returns:
+        int: Number of posts whose counter was corrected.
+    """
+    actual = (
+        select(func.count(models.Vote.post_id))
+        .where(models.Vote.post_id == models.Post.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(models.Post)
+        .where(models.Post.vote_count != actual)
+        .values(vote_count=actual, hot_score=hot_score(actual, models.Post.created_at))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+def prune_vote_hours(db: Session) -> int:
+    """
+    Delete hourly vote buckets older than the longest top ranking window.
+    Args:
+        db (Session): SQLAlchemy session used for the delete.
+    Returns:
+        int: Number of buckets deleted.
+    """
+    result = db.execute(
+        delete(models.PostVoteHour)
+        .where(models.PostVoteHour.hour < func.now() - VOTE_HOURS_RETENTION)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+def main():
+    """Command-line entry point: `python -m app.maintenance {repair-vote-counts,prune-vote-hours}`."""
+    parser = argparse.ArgumentParser(description="Chirp maintenance commands")
+    parser.add_argument("command", choices=["repair-vote-counts", "prune-vote-hours"])
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        if args.command == "repair-vote-counts":
+            print(f"Corrected vote_count on {repair_vote_counts(db)} post(s)")
+        else: # prune-vote-hours
+            print(f"Deleted {prune_vote_hours(db)} expired vote bucket(s)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+from app.cache import response_cache
+from app.database import get_pool_status
+from app.oauth2 import token_cache, user_cache
+from app.utils import password_hash_executor
+from fastapi import Response
+from prometheus_client import (
+    CollectorRegistry,
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    generate_latest,
+    Histogram,
+    multiprocess,
+    REGISTRY,
+)
+import os
+import time
+
+# Request metrics; with PROMETHEUS_MULTIPROC_DIR set, values live in shared files summed over workers
+REQUESTS = Counter(
+    "chirp_http_requests_total", "HTTP requests by route and status code.", ["method", "route", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "chirp_http_request_duration_seconds", "HTTP request latency by route.", ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+RATE_LIMITED = Counter(
+    "chirp_rate_limited_total", "Requests rejected with 429 by rate limit policy.", ["policy"]
+)
+IN_PROGRESS = Gauge(
+    "chirp_http_requests_in_progress", "HTTP requests being handled.", ["method"], multiprocess_mode="livesum"
+)
+
+# Process state, sampled by each worker (live workers are summed, or the maximum is taken)
+POOL_CHECKED_OUT = Gauge(
+    "chirp_db_pool_checked_out", "Database connections checked out.", multiprocess_mode="livesum"
+)
+POOL_CAPACITY = Gauge(
+    "chirp_db_pool_capacity", "Database pool size plus overflow (0 when unbounded).", multiprocess_mode="livesum"
+)
+POOL_TIMEOUTS = Gauge(
+    "chirp_db_pool_timeouts", "Connection checkouts that timed out since start.", multiprocess_mode="livesum"
+)
+POOL_WAIT_MAX = Gauge(
+    "chirp_db_pool_wait_seconds_max", "Longest connection checkout wait.", multiprocess_mode="livemax"
+)
+CACHE_HITS = Gauge("chirp_cache_hits", "Cache hits since start.", ["cache"], multiprocess_mode="livesum")
+CACHE_MISSES = Gauge("chirp_cache_misses", "Cache misses since start.", ["cache"], multiprocess_mode="livesum")
+CACHE_SIZE = Gauge("chirp_cache_size", "Entries held by in-process caches.", ["cache"], multiprocess_mode="livesum")
+HASH_QUEUE_DEPTH = Gauge(
+    "chirp_password_hash_queue_depth", "Password hashes running or waiting for a worker.", multiprocess_mode="livesum"
+)
+
+# Minimum seconds between two samples of the process state by the same worker
+SAMPLE_INTERVAL = 1.0
+_last_sample = 0.0
+
+def sample_process_state(force: bool = False):
+    """
+    Copy pool, cache and hash queue figures of this process into the gauges.
+    Every worker samples itself while serving requests, since the one answering
+    a scrape cannot read the state of the others.
+    Args:
+        force (bool): Sample even if the last sample is more recent than SAMPLE_INTERVAL.
+    """
+    global _last_sample
+    now = time.monotonic()
+    if not force and now - _last_sample < SAMPLE_INTERVAL:
+        return
+    _last_sample = now
+    pool = get_pool_status()
+    POOL_CHECKED_OUT.set(pool["checked_out"])
+    POOL_CAPACITY.set(pool["capacity"] or 0)
+    POOL_TIMEOUTS.set(pool["timeouts"])
+    POOL_WAIT_MAX.set(pool["wait_seconds_max"])
+    for name, cache in (("users", user_cache), ("tokens", token_cache), ("responses", response_cache)):
+        stats = cache.stats()
+        CACHE_HITS.labels(name).set(stats["hits"])
+        CACHE_MISSES.labels(name).set(stats["misses"])
+        CACHE_SIZE.labels(name).set(stats["size"] or 0)
+    HASH_QUEUE_DEPTH.set(password_hash_executor.pending)
+
+def metrics_response() -> Response:
+    """
+    Render all metrics in the Prometheus text exposition format.
+    Returns:
+        Response: Metrics of every worker when PROMETHEUS_MULTIPROC_DIR is set, else of this process.
+    """
+    sample_process_state(force=True)
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts, latency and in-flight requests.
+    Requests are labelled with their route template (e.g. /posts/{id}) to keep
+    label cardinality bounded; requests matching no route share "unmatched".
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - start)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            in_progress.dec()
+            sample_process_state()
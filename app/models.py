@@ -1,9 +1,14 @@
 from app.database import Base
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from app.ranking import HOT_SCORE_DECAY_SECONDS
+from sqlalchemy import Boolean, Column, Computed, DDL, event, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql.expression import text
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 
+# Trigram matching backs the typo-tolerant search fallback
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 # Database models
 class Post(Base):
     """
@@ -20,8 +25,45 @@ class Post(Base):
         server_default=text('now()')
     )
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    # Relationship to the user who owns this post
-    owner = relationship("User")
+    # Denormalized number of votes, maintained by every vote write
+    vote_count = Column(Integer, nullable=False, server_default='0')
+    # Time-decayed `ranking.hot_score`, maintained together with vote_count.
+    # The default is the score of a new post without votes.
+    hot_score = Column(
+        Float,
+        nullable=False,
+        server_default=text(f"extract(epoch from now()) / {HOT_SCORE_DECAY_SECONDS}")
+    )
+    # Weighted full-text document over title and content, generated by Postgres.
+    # Deferred so regular post reads never fetch it.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', title), 'A') || "
+            "setweight(to_tsvector('english', content), 'B')",
+            persisted=True
+        )
+    ))
+    # Relationship to the user who owns this post. Never lazy-loaded: queries that need
+    # the owner opt in with `serialization.load_owner` or join its columns explicitly,
+    # so a per-row owner SELECT (N+1) fails loudly instead of slipping in
+    owner = relationship("User", lazy="raise_on_sql")
+    # Composite indexes backing keyset pagination on (created_at, id) and (vote_count, id),
+    # plus GIN indexes for full-text search and trigram title matching; the owner_id
+    # index serves per-user lookups and the ON DELETE CASCADE from users
+    __table_args__ = (
+        Index("ix_posts_owner_id", "owner_id"),
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_vote_count_id", "vote_count", "id"),
+        Index("ix_posts_hot_score_id", "hot_score", "id"),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_posts_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"}
+        ),
+    )
 
 class User(Base):
     """
@@ -44,4 +86,30 @@ class Vote(Base):
     """
     __tablename__ = "votes"
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
-    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
\ No newline at end of file
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text('now()')
+    )
+    __table_args__ = (
+        # The primary key leads with user_id; per-post lookups and the ON DELETE CASCADE from posts need post_id first
+        Index("ix_votes_post_id", "post_id"),
+        # Vote exports read votes in creation order, index-only
+        Index("ix_votes_created_at", "created_at", "user_id", "post_id"),
+    )
+
+class PostVoteHour(Base):
+    """
+    Net votes a post received within one UTC hour, maintained by every vote write.
+    Backs the windowed top ranking without scanning the votes table; buckets
+    older than `ranking.VOTE_HOURS_RETENTION` are never read and can be pruned.
+    """
+    __tablename__ = "post_vote_hours"
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    hour = Column(TIMESTAMP(timezone=True), primary_key=True)
+    votes = Column(Integer, nullable=False)
+    # Covers the window scan (hour range, then post and votes) as an index-only scan
+    __table_args__ = (
+        Index("ix_post_vote_hours_hour", "hour", "post_id", "votes"),
+    )
\ No newline at end of file
@@ -1,21 +1,33 @@
 from app import models, schemas
-from app.config import settings
-from app.database import get_db
+from app.cache import TTLCache
+from app.config import Lazy, settings
+from app.database import get_async_db
 from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt import decode, encode
 from jwt.exceptions import InvalidTokenError
-from sqlalchemy.orm import Session
-
-# JWT & OAuth2 configuration
-SECRET_KEY = settings.secret_key
-ALGORITHM = settings.algorithm
-ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+from sqlalchemy.ext.asyncio import AsyncSession
+import hashlib
+import time
 
 # OAuth2 scheme for FastAPI dependency injection
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='login')
 
+# Decoded claims of already verified tokens keyed by token digest
+token_cache = Lazy(lambda: TTLCache(maxsize=settings.token_cache_size, ttl=settings.token_cache_ttl_seconds))
+
+# Authenticated users keyed by user id, so hot endpoints skip the per-request lookup
+user_cache = Lazy(lambda: TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds))
+
+def invalidate_cached_user(user_id: int):
+    """
+    Drop a user from the authenticated-user cache after it is created or changed.
+    Args:
+        user_id (int): The ID of the user whose row changed.
+    """
+    user_cache.invalidate(user_id)
+
 # JWT token utilities
 def create_access_token(data: dict):
     """
@@ -26,40 +38,52 @@ def create_access_token(data: dict):
         str: Encoded JWT token
     """
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
     to_encode.update({"exp": expire})
-    encoded_jwt = encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 def verify_access_token(token: str, credentials_exception):
     """
     Verify a JWT token and extract the payload.
+    Verified claims are cached by token digest until the earlier of the cache TTL
+    and the token's `exp`, so repeated bearer tokens skip the signature check.
     Args:
         token (str): JWT token string
         credentials_exception (HTTPException): Exception to raise if token is invalid
     Returns:
         TokenData: Pydantic schema with extracted user ID
     """
-    try:
-        payload = decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("user_id")
-        if user_id is None:
+    token_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(token_key)
+    if payload is None:
+        try:
+            payload = decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        except InvalidTokenError:
             raise credentials_exception
-        return schemas.TokenData(id=str(user_id))
-    except InvalidTokenError:
+        expires_at = None
+        if isinstance(payload.get("exp"), (int, float)):
+            # Translate the wall-clock exp into the cache's monotonic clock
+            expires_at = time.monotonic() + (payload["exp"] - time.time())
+        token_cache.set(token_key, payload, expires_at=expires_at)
+    user_id = payload.get("user_id")
+    if user_id is None:
         raise credentials_exception
+    return schemas.TokenData(id=str(user_id))
 
 # Dependency to get current user
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> models.User:
+    db: AsyncSession = Depends(get_async_db)
+) -> schemas.CurrentUser:
     """
     FastAPI dependency to retrieve the currently authenticated user.
+    Users are served from a bounded TTL cache; with `auth_trust_token` the
+    principal is built from the token claims without touching the database.
     Raises:
         HTTPException: If token is invalid or user not found
     Returns:
-        User: SQLAlchemy User instance
+        CurrentUser: The authenticated principal
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,8 +91,31 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     token_data = verify_access_token(token, credentials_exception)
-    user = db.query(models.User).filter(models.User.id == token_data.id).first()
+    try:
+        user_id = int(token_data.id)
+    except ValueError:
+        raise credentials_exception
+    if settings.auth_trust_token:
+        return schemas.CurrentUser(id=user_id)
+    current_user = user_cache.get(user_id)
+    if current_user is not None:
+        return current_user
+    user = await db.get(models.User, user_id)
     if not user:
         credentials_exception.detail = "User not found"
         raise credentials_exception
-    return user
\ No newline at end of file
+    current_user = schemas.CurrentUser.model_validate(user)
+    user_cache.set(user_id, current_user)
+    return current_user
+
+async def get_export_user(current_user: schemas.CurrentUser = Depends(get_current_user)) -> schemas.CurrentUser:
+    """
+    FastAPI dependency restricting a route to the users listed in `settings.export_user_ids`.
+    Raises:
+        HTTPException: 403 Forbidden if the authenticated user is not allowed to export.
+    Returns:
+        CurrentUser: The authenticated principal
+    """
+    if current_user.id not in settings.export_user_ids:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to export data")
+    return current_user
\ No newline at end of file
@@ -0,0 +1,44 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List
+
+# Keyset cursor utilities
+def encode_cursor(sort: str, key: List[Any]) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor.
+    Args:
+        sort (str): Sort order the cursor belongs to (e.g., "new", "top").
+        key (List[Any]): Sort key values of the last row, ending with the post id.
+    Returns:
+        str: URL-safe cursor string.
+    """
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    payload = json.dumps({"s": sort, "k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, key_types: List[type]) -> List[Any]:
+    """
+    Decode an opaque cursor back into sort key values.
+    Args:
+        cursor (str): Cursor previously returned as `next_cursor`.
+        sort (str): Sort order of the current request.
+        key_types (List[type]): Expected type of each sort key value.
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another sort order.
+    Returns:
+        List[Any]: Sort key values to resume after.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["k"]
+        if payload["s"] != sort or len(values) != len(key_types):
+            raise ValueError("Cursor does not match the requested sort order")
+        return [
+            datetime.fromisoformat(value) if key_type is datetime else key_type(value)
+            for key_type, value in zip(key_types, values)
+        ]
+    except (KeyError, TypeError, UnicodeDecodeError, json.JSONDecodeError, binascii.Error) as exc:
+        raise ValueError("Malformed cursor") from exc
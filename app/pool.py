@@ -0,0 +1,97 @@
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+import threading
+import time
+
+# Connection pool instrumentation
+class PoolStats:
+    """
+    Thread-safe checkout counters for a connection pool.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, waited: float, timed_out: bool = False):
+        """Record one checkout attempt and how long it waited for a connection."""
+        with self._lock:
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.in_use += 1
+
+    def record_checkin(self):
+        """Record a connection returned to the pool."""
+        with self._lock:
+            self.in_use -= 1
+
+class _TimedCheckoutMixin:
+    """
+    Pool mixin measuring how long each connection checkout waits,
+    including time spent blocked on an exhausted pool and pre-ping.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def _do_return_conn(self, record):
+        self.stats.record_checkin()
+        super()._do_return_conn(record)
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool for the psycopg2 engine with checkout timing."""
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """QueuePool for the asyncpg engine with checkout timing."""
+
+class TimedNullPool(_TimedCheckoutMixin, NullPool):
+    """NullPool (one connection per checkout) with checkout timing."""
+
+def pool_status(pool, max_overflow: int) -> dict:
+    """
+    Summarize the usage of a connection pool.
+    Saturation is the share of the pool's capacity (pool_size + max_overflow)
+    currently checked out; it is None for unbounded pools such as NullPool.
+    Args:
+        pool (Pool): The pool of an engine (`engine.pool`).
+        max_overflow (int): The max_overflow the pool was created with.
+    Returns:
+        dict: Pool mode, capacity, overflow, usage and checkout wait statistics.
+    """
+    stats = getattr(pool, "stats", None) or PoolStats()
+    size = capacity = overflow = saturation = None
+    if isinstance(pool, QueuePool):
+        size = pool.size()
+        capacity = size + max(max_overflow, 0)
+        overflow = max(pool.overflow(), 0)
+        saturation = round(stats.in_use / capacity, 4) if capacity else None
+    attempts = stats.checkouts + stats.timeouts
+    return {
+        "mode": "null" if isinstance(pool, NullPool) else "queue",
+        "size": size,
+        "capacity": capacity,
+        "overflow": overflow,
+        "checked_out": stats.in_use,
+        "saturation": saturation,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_seconds_avg": round(stats.wait_seconds_total / attempts, 6) if attempts else 0.0,
+        "wait_seconds_max": round(stats.wait_seconds_max, 6),
+    }
@@ -0,0 +1,108 @@
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from typing import Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Per-request query statistics
+class QueryStats:
+    """Statements and database time accumulated by one request."""
+    __slots__ = ("scope", "count", "seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        """Route template of the request once routed (e.g. /posts/{id}), else its raw path."""
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "")
+
+    def server_timing(self) -> str:
+        """Format the figures as a Server-Timing header value."""
+        return f'db;dur={self.seconds * 1000:.3f};desc="{self.count} queries"'
+
+# Statistics of the request being handled; copied into threadpool calls and SQLAlchemy's greenlets
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+class QueryInstrumentation:
+    """
+    Counts and times statements per request through engine cursor events, and
+    logs statements slower than `slow_query_seconds` with their route.
+    Nothing is hooked until `instrument` is called, so it costs nothing when disabled;
+    with `enabled` set, requests are reported even before the first engine is instrumented.
+    """
+    def __init__(self, slow_query_seconds: float, enabled: bool = False):
+        self.slow_query_seconds = slow_query_seconds
+        self.engines = []
+        self._enabled = enabled
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled or bool(self.engines)
+
+    def instrument(self, engine):
+        """Start timing statements of a (sync) engine; pass `async_engine.sync_engine` for async engines."""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+        self.engines.append(engine)
+
+    def uninstrument(self, engine):
+        """Stop timing statements of an engine."""
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(engine, "handle_error", self._handle_error)
+        self.engines.remove(engine)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+        if elapsed >= self.slow_query_seconds:
+            route = stats.route if stats is not None else "-"
+            logger.warning("Slow query (%.1f ms) on %s: %s", elapsed * 1000, route, statement)
+
+    def _handle_error(self, context):
+        # A failed statement never reaches after_cursor_execute: drop its start time from the pooled connection
+        if context.connection is not None and context.execution_context is not None:
+            starts = context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware collecting the query statistics of each HTTP request and
+    reporting them in a `Server-Timing` response header.
+    Passes requests straight through while the instrumentation is disabled.
+    """
+    def __init__(self, app, instrumentation: QueryInstrumentation):
+        self.app = app
+        self.instrumentation = instrumentation
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.instrumentation.enabled:
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats(scope)
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
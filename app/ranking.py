@@ -0,0 +1,33 @@
+from datetime import timedelta
+from sqlalchemy import Float, func, type_coerce
+
+# Seconds of recency worth a tenfold increase in votes in the hot score
+HOT_SCORE_DECAY_SECONDS = 45000
+
+# Vote windows served by the top ranking; hourly vote buckets are kept for the longest one
+TOP_WINDOWS = {
+    "1h": timedelta(hours=1),
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+}
+VOTE_HOURS_RETENTION = max(TOP_WINDOWS.values())
+
+def hot_score(vote_count, created_at):
+    """
+    Time-decayed ranking score of a post: log10 of its votes plus its age bonus.
+    Newer posts start higher, so an older post needs ten times the votes to
+    outrank a post created `HOT_SCORE_DECAY_SECONDS` after it. Scores only change
+    with votes and never need recomputing as time passes.
+    Args:
+        vote_count: SQL expression or value of the post's vote count.
+        created_at: SQL expression of the post's creation time.
+    Returns:
+        ColumnElement: The score as a double precision SQL expression.
+    """
+    score = func.log(func.greatest(vote_count, 1)) + func.extract("epoch", created_at) / HOT_SCORE_DECAY_SECONDS
+    return type_coerce(score, Float)
+
+def vote_hour(created_at):
+    """Truncate a vote timestamp to the start of its UTC hour bucket."""
+    return func.date_trunc("hour", created_at, "UTC")
@@ -0,0 +1,224 @@
+from app.config import Lazy, settings
+from app.metrics import RATE_LIMITED
+from app.oauth2 import verify_access_token
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from typing import Callable, Dict, List, Literal, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rate limit policies
+PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0}
+
+class Rate(NamedTuple):
+    """Allows `limit` requests per `period` seconds, up to `limit` of them in a burst."""
+    limit: int
+    period: float
+
+def parse_rate(value: str) -> Optional[Rate]:
+    """
+    Parse a rate limit setting.
+    Args:
+        value (str): "<count>/<second|minute|hour>", e.g. "10/minute"; empty disables the limit.
+    Raises:
+        ValueError: If the value is malformed.
+    Returns:
+        Rate: The parsed rate, or None when disabled.
+    """
+    if not value:
+        return None
+    count, _, unit = value.partition("/")
+    try:
+        rate = Rate(int(count), PERIODS[unit.strip()])
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid rate limit {value!r}, expected e.g. '10/minute'")
+    if rate.limit < 1:
+        raise ValueError(f"Invalid rate limit {value!r}, the count must be positive")
+    return rate
+
+class Policy(NamedTuple):
+    """
+    Rate limit applied to the requests of some routes.
+    Requests are counted per JWT user (falling back to the client IP when the
+    token is missing or invalid) or per client IP; with `query_param` set, only
+    requests carrying a non-empty value for it are counted.
+    """
+    name: str
+    method: str
+    paths: Tuple[str, ...]
+    rate: Rate
+    key: Literal["user", "ip"]
+    query_param: Optional[str] = None
+
+def configured_policies() -> List[Policy]:
+    """Build the enabled policies from the RATE_LIMIT_* settings; none when RATE_LIMIT_BACKEND is "none"."""
+    if settings.rate_limit_backend == "none":
+        return []
+    policies = [
+        # Every login attempt runs Argon2, and there is no user to key on yet
+        Policy("login", "POST", ("/login",), parse_rate(settings.rate_limit_login), "ip"),
+        Policy("vote", "POST", ("/vote/", "/vote/batch"), parse_rate(settings.rate_limit_vote), "user"),
+        # Listings and the feed run the same full-text and trigram search
+        Policy("search", "GET", ("/posts/", "/posts/feed"), parse_rate(settings.rate_limit_search), "user", query_param="search"),
+    ]
+    return [policy for policy in policies if policy.rate]
+
+# Rate limiter backends
+class MemoryRateLimiter:
+    """
+    Per-process GCRA (generic cell rate algorithm) limiter.
+    Holds one theoretical arrival time (TAT) per key: each allowed request pushes
+    it `period / limit` seconds further, and a request is rejected while the TAT
+    is more than `period` ahead of now. Keys are kept in least recently allowed
+    order and the oldest is evicted once `maxsize` keys are tracked.
+    """
+    def __init__(self, maxsize: int, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._tats: Dict[str, float] = {}
+
+    async def hit(self, key: str, rate: Rate) -> float:
+        """Count a request; returns 0 if it is allowed, else the seconds until it would be."""
+        now = self.clock()
+        stored = self._tats.pop(key, None)
+        tat = now if stored is None or stored < now else stored
+        new_tat = tat + rate.period / rate.limit
+        retry_after = new_tat - rate.period - now
+        if retry_after > 0:
+            self._tats[key] = stored
+            return retry_after
+        while len(self._tats) >= self.maxsize:
+            del self._tats[next(iter(self._tats))]
+        self._tats[key] = new_tat
+        return 0.0
+
+    async def clear(self):
+        self._tats.clear()
+
+class RedisRateLimiter:
+    """
+    GCRA limiter on any Redis-protocol server, shared by all workers.
+    Each check is one atomic script call, timed by the server's clock so workers
+    on different hosts agree; state expires once a key's bucket is full again.
+    Requests are allowed when the server cannot be reached.
+    """
+    SCRIPT = """
+        local time = redis.call('TIME')
+        local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+        local interval, period = tonumber(ARGV[1]), tonumber(ARGV[2])
+        local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+        local retry_after = tat + interval - period - now
+        if retry_after > 0 then
+            return tostring(retry_after)
+        end
+        redis.call('SET', KEYS[1], tostring(tat + interval), 'PX', math.ceil((tat + interval - now) * 1000))
+        return '0'
+    """
+
+    def __init__(self, client, prefix: str = "chirp:ratelimit:"):
+        from redis.exceptions import RedisError
+        self.client = client
+        self.prefix = prefix
+        self.script = client.register_script(self.SCRIPT)
+        self._errors = RedisError
+
+    async def hit(self, key: str, rate: Rate) -> float:
+        """Count a request; returns 0 if it is allowed, else the seconds until it would be."""
+        try:
+            return float(await self.script(keys=[self.prefix + key], args=[rate.period / rate.limit, rate.period]))
+        except self._errors:
+            logger.warning("Rate limiter unavailable, allowing request", exc_info=True)
+            return 0.0
+
+    async def clear(self):
+        keys = [key async for key in self.client.scan_iter(match=f"{self.prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+# Rate limiting middleware
+class RateLimitMiddleware:
+    """
+    ASGI middleware rejecting requests over their route's policies with
+    `429 Too Many Requests` and a `Retry-After` header, before routing, auth or
+    body parsing. Requests to routes without a policy pass straight through.
+    Without `policies`, enforces the configured ones with the shared `rate_limiter`,
+    both read when the middleware stack is built on the first request.
+    """
+    def __init__(self, app, limiter=None, policies: Optional[List[Policy]] = None):
+        if policies is None:
+            policies = configured_policies()
+            limiter = rate_limiter if policies else None
+        self.app = app
+        self.limiter = limiter
+        self.routes: Dict[Tuple[str, str], List[Policy]] = {}
+        for policy in policies:
+            for path in policy.paths:
+                self.routes.setdefault((policy.method, path), []).append(policy)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.limiter is None:
+            await self.app(scope, receive, send)
+            return
+        for policy in self.routes.get((scope["method"], scope["path"]), ()):
+            if policy.query_param and not _has_query_param(scope, policy.query_param):
+                continue
+            retry_after = await self.limiter.hit(f"{policy.name}:{_client_key(scope, policy.key)}", policy.rate)
+            if retry_after > 0:
+                RATE_LIMITED.labels(policy.name).inc()
+                response = JSONResponse(
+                    {"detail": "Too many requests"},
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+def _has_query_param(scope, name: str) -> bool:
+    """Whether the request's query string holds a non-empty `name` parameter."""
+    return any(key == name and value for key, value in parse_qsl(scope["query_string"].decode("latin-1")))
+
+def _client_key(scope, key: str) -> str:
+    """
+    Identify the client a policy counts the request against.
+    The user id comes from a verified bearer token (served from the token cache);
+    the IP is the ASGI client address, so run behind proxies with the server's
+    forwarded-IP support enabled (FORWARDED_ALLOW_IPS).
+    """
+    if key == "user":
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        return f"user:{verify_access_token(token, HTTPException(status.HTTP_401_UNAUTHORIZED)).id}"
+                    except HTTPException:
+                        pass
+                break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+def _rate_limiter():
+    """
+    Build the rate limiter backend selected by `settings.rate_limit_backend`.
+    Raises:
+        RuntimeError: If the redis backend is selected but the redis package is missing.
+    Returns:
+        MemoryRateLimiter | RedisRateLimiter | None: The limiter, or None when rate limiting is disabled.
+    """
+    if settings.rate_limit_backend == "memory":
+        return MemoryRateLimiter(settings.rate_limit_memory_size)
+    if settings.rate_limit_backend == "redis":
+        try:
+            from redis.asyncio import Redis
+        except ImportError as error:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package") from error
+        return RedisRateLimiter(Redis.from_url(settings.rate_limit_redis_url))
+    return None
+
+# Shared rate limiter, built on first use
+rate_limiter = Lazy(_rate_limiter)
@@ -1,33 +1,43 @@
 from app import models, schemas
-from app.database import get_db
+from app.database import get_async_db
 from app.oauth2 import create_access_token
-from app.utils import verify_password
+from app.utils import verify_and_update_password
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(tags=['Authentication'])
 
 @router.post('/login', response_model=schemas.Token)
-def login(
+async def login(
     user_credentials: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Authenticate a user and return a JWT access token.
+    Stored hashes made with outdated Argon2 parameters are upgraded on success.
     Args:
         user_credentials (OAuth2PasswordRequestForm): Form containing username (email) and password.
-        db (Session): SQLAlchemy session provided by dependency injection.
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
     Raises:
         HTTPException: 403 Forbidden if credentials are invalid.
+        HTTPException: 503 Service Unavailable if the password hashing queue is full.
     Returns:
         dict: Access token and token type.
     """
     # Retrieve user by email
-    user = db.query(models.User).filter(models.User.email == user_credentials.username).first()
+    user = await db.scalar(select(models.User).where(models.User.email == user_credentials.username))
     # Verify user existence and password correctness
-    if not user or not verify_password(user_credentials.password, user.password):
+    if not user:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid Credentials")
+    valid, updated_hash = await verify_and_update_password(user_credentials.password, user.password)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid Credentials")
+    # Upgrade hashes made with outdated parameters
+    if updated_hash:
+        user.password = updated_hash
+        await db.commit()
     # Generate JWT access token
     access_token = create_access_token(data={"user_id": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
@@ -0,0 +1,63 @@
+from app import schemas
+from app.database import get_async_db
+from app.export import export_query, MEDIA_TYPES, stream_export
+from app.oauth2 import get_export_user
+from datetime import datetime
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+router = APIRouter(prefix="/export", tags=['Export'])
+
+def _export_response(db: AsyncSession, dataset: str, format: schemas.ExportFormat, since: Optional[datetime]):
+    """Stream a dataset export as a downloadable file."""
+    return StreamingResponse(
+        stream_export(db, export_query(dataset, since), format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format.value}"'},
+    )
+
+@router.get("/posts", response_class=StreamingResponse)
+async def export_posts(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: int = Depends(get_export_user),
+    format: schemas.ExportFormat = schemas.ExportFormat.ndjson,
+    since: Optional[datetime] = None
+):
+    """
+    Export every post with its vote count, oldest first.
+    Rows stream from a server-side cursor, so the export runs in constant memory.
+    Args:
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
+        current_user (int): The currently authenticated user, one of EXPORT_USER_IDS.
+        format (schemas.ExportFormat): "ndjson" (default) or "csv".
+        since (datetime): Only export posts created at or after this time, for incremental exports.
+    Raises:
+        HTTPException: 403 Forbidden if the user is not allowed to export.
+    Returns:
+        StreamingResponse: id, title, content, published, created_at, owner_id and vote_count of each post.
+    """
+    return _export_response(db, "posts", format, since)
+
+@router.get("/votes", response_class=StreamingResponse)
+async def export_votes(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: int = Depends(get_export_user),
+    format: schemas.ExportFormat = schemas.ExportFormat.ndjson,
+    since: Optional[datetime] = None
+):
+    """
+    Export every vote, oldest first.
+    Rows stream from a server-side cursor, so the export runs in constant memory.
+    Args:
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
+        current_user (int): The currently authenticated user, one of EXPORT_USER_IDS.
+        format (schemas.ExportFormat): "ndjson" (default) or "csv".
+        since (datetime): Only export votes cast at or after this time, for incremental exports.
+    Raises:
+        HTTPException: 403 Forbidden if the user is not allowed to export.
+    Returns:
+        StreamingResponse: user_id, post_id and created_at of each vote.
+    """
+    return _export_response(db, "votes", format, since)
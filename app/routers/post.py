@@ -1,96 +1,453 @@
 from app import models, schemas
-from app.database import get_db
+from app.cache import etag_response, response_cache
+from app.config import settings
+from app.database import get_async_db
 from app.oauth2 import get_current_user
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from app.pagination import decode_cursor, encode_cursor
+from app.ranking import TOP_WINDOWS
+from app.serialization import (
+    dump_json,
+    dump_post_out_list,
+    dump_post_page,
+    load_owner,
+    overlay_voted_by_me,
+    OWNER_COLUMNS,
+    post_document,
+    post_out,
+    POST_OUT_COLUMNS,
+    select_post_out,
+    split_voted_by_me,
+    voted_post_candidates,
+)
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from pydantic import ValidationError
+from sqlalchemy import any_, bindparam, Boolean, column, func, insert, Integer, literal, or_, select, String, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional, Set
 
 router = APIRouter(prefix="/posts", tags=['Posts'])
 
+def _search_filter(search: str):
+    """
+    Build the filter and ranking for a post search.
+    Full-text matches over title and content use the GIN `search_vector` index;
+    a trigram fallback on the title (substring and word similarity) catches
+    prefixes and typos through the GIN trigram index.
+    Args:
+        search (str): Search terms in web search syntax (quotes, OR, -term).
+    Returns:
+        tuple: Filter clause and ORDER BY expressions ranking the best matches first.
+    """
+    ts_query = func.websearch_to_tsquery("english", search)
+    escaped = search.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    clause = or_(
+        models.Post.search_vector.op("@@")(ts_query),
+        models.Post.title.ilike(f"%{escaped}%", escape="/"),
+        literal(search).op("<%")(models.Post.title),
+    )
+    ranking = [
+        func.ts_rank(models.Post.search_vector, ts_query).desc(),
+        func.word_similarity(search, models.Post.title).desc(),
+    ]
+    return clause, ranking
+
+async def _voted_post_ids(db: AsyncSession, user_id: int, post_ids: List[int]) -> Set[int]:
+    """
+    Look up which of a page's posts a user voted on, probing the (user_id, post_id) primary key of `votes`.
+    Args:
+        db (AsyncSession): SQLAlchemy session.
+        user_id (int): The requesting user.
+        post_ids (List[int]): Ids of the posts on the page.
+    Returns:
+        Set[int]: The ids of the posts the user voted on.
+    """
+    if not post_ids:
+        return set()
+    id_array = bindparam("post_ids", post_ids, type_=postgresql.ARRAY(Integer))
+    query = select(models.Vote.post_id).where(models.Vote.user_id == user_id, models.Vote.post_id == any_(id_array))
+    return set((await db.execute(query)).scalars())
+
+async def _keyset_page(
+    db: AsyncSession,
+    query,
+    sort: str,
+    sort_key: tuple,
+    key_types: List[type],
+    cursor: Optional[str],
+    limit: int
+) -> Response:
+    """
+    Fetch one keyset-paginated page of a `select_post_out` query, in descending `sort_key` order.
+    Args:
+        db (AsyncSession): SQLAlchemy session used for the query.
+        query (Select): Post query built on `select_post_out`.
+        sort (str): Name of the ordering, bound into cursors so they cannot be reused across orderings.
+        sort_key (tuple): Columns ordering the page, ending with a unique column.
+        key_types (List[type]): Type of each sort key value, for decoding cursors.
+        cursor (str): Opaque `next_cursor` from the previous page, or None for the first page.
+        limit (int): Maximum number of posts to return.
+    Raises:
+        HTTPException: 400 Bad Request if the cursor is malformed or belongs to another ordering.
+    Returns:
+        Response: JSON `schemas.PostPage`.
+    """
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort, key_types)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(tuple_(*sort_key) < tuple_(*after))
+    # Fetch the sort key after the post columns, and one extra row to know whether another page exists
+    query = query.add_columns(*sort_key).order_by(*(column.desc() for column in sort_key)).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, list(rows[-1][len(POST_OUT_COLUMNS):]))
+    page = dump_post_page((row[:len(POST_OUT_COLUMNS)] for row in rows), next_cursor)
+    return Response(content=page, media_type="application/json")
+
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.Post)
-def create_post(
+async def create_post(
     post: schemas.PostCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: int = Depends(get_current_user)
 ):
     """
     Create a new post owned by the current user.
     Args:
         post (schemas.PostCreate): The post data to create.
-        db (Session): SQLAlchemy session provided by dependency injection.
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
         current_user (int): The currently authenticated user.
     Returns:
         schemas.Post: The created post.
     """
     new_post = models.Post(owner_id=current_user.id, **post.model_dump())
     db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
-    return new_post
+    await db.commit()
+    await response_cache.invalidate("posts")
+    # Reload server defaults together with the owner in a single round-trip
+    return await db.scalar(
+        select(models.Post)
+        .options(load_owner())
+        .where(models.Post.id == new_post.id)
+        .execution_options(populate_existing=True)
+    )
+
+@router.post(
+    "/bulk",
+    status_code=status.HTTP_201_CREATED,
+    response_model=schemas.PostBulkResult,
+    responses={status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": schemas.PostBulkResult}},
+)
+async def create_posts_bulk(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: int = Depends(get_current_user),
+    posts: List[Any] = Body(min_length=1)
+):
+    """
+    Create many posts owned by the current user in a single statement, e.g. for imports.
+    Each item is validated on its own: valid items are created and invalid ones are
+    reported by index. The valid posts are bound as column arrays and inserted with
+    `INSERT ... SELECT FROM unnest(...) RETURNING`, joined to the owner in the same
+    round-trip, so every batch size shares one statement and query plan.
+    Args:
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
+        current_user (int): The currently authenticated user.
+        posts (List[Any]): `schemas.PostCreate` items, at most POST_BULK_MAX_ITEMS.
+    Raises:
+        HTTPException: 422 if more than POST_BULK_MAX_ITEMS items are sent.
+    Returns:
+        Response: JSON `schemas.PostBulkResult` with the created posts in request order and
+        the validation errors of the rejected items; 422 if no item was valid.
+    """
+    # Limits are read per request so the router can be imported before the settings
+    if len(posts) > settings.post_bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"At most {settings.post_bulk_max_items} posts per request",
+        )
+    valid, errors = [], []
+    for index, item in enumerate(posts):
+        try:
+            valid.append(schemas.PostCreate.model_validate(item))
+        except ValidationError as exc:
+            errors.append({"index": index, "detail": exc.errors(include_url=False, include_context=False)})
+    if not valid:
+        body = {"created": [], "errors": errors}
+        return Response(content=dump_json(body), status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, media_type="application/json")
+    # Each item draws its id next to its request position; the created rows are joined
+    # back to it on id, as Postgres does not promise ids in the insert's selection order.
+    # The CTE calls nextval, so it is evaluated once and never inlined.
+    unnested = func.unnest(
+        bindparam("titles", [post.title for post in valid], type_=postgresql.ARRAY(String)),
+        bindparam("contents", [post.content for post in valid], type_=postgresql.ARRAY(String)),
+        bindparam("published", [post.published for post in valid], type_=postgresql.ARRAY(Boolean)),
+    ).table_valued(
+        column("title", String), column("content", String), column("published", Boolean), with_ordinality="position"
+    ).render_derived()
+    items = select(
+        func.nextval(func.pg_get_serial_sequence(models.Post.__tablename__, "id")).label("id"),
+        unnested.c.title,
+        unnested.c.content,
+        unnested.c.published,
+        unnested.c.position,
+    ).cte("items")
+    new_posts = (
+        insert(models.Post)
+        .from_select(
+            ["id", "title", "content", "published", "owner_id"],
+            select(
+                items.c.id, items.c.title, items.c.content, items.c.published,
+                bindparam("owner_id", current_user.id, type_=Integer),
+            ),
+        )
+        .returning(
+            models.Post.title,
+            models.Post.content,
+            models.Post.published,
+            models.Post.id,
+            models.Post.created_at,
+            models.Post.owner_id,
+        )
+        .cte("new_posts")
+    )
+    rows = (await db.execute(
+        select(new_posts, *OWNER_COLUMNS)
+        .join(items, items.c.id == new_posts.c.id)
+        .join(models.User, models.User.id == new_posts.c.owner_id)
+        .order_by(items.c.position)
+    )).all()
+    await db.commit()
+    await response_cache.invalidate("posts")
+    body = {"created": [post_document(row) for row in rows], "errors": errors}
+    return Response(content=dump_json(body), status_code=status.HTTP_201_CREATED, media_type="application/json")
 
 @router.get("/", response_model=List[schemas.PostOut])
-def get_posts(
-    db: Session = Depends(get_db),
-    _ = Depends(get_current_user),
+async def get_posts(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: int = Depends(get_current_user),
     limit: int = 10,
     skip: int = 0,
     search: Optional[str] = ""
 ):
     """
-    Retrieve all posts with optional search, pagination, and vote count.
+    Retrieve all posts, newest first, with optional search, pagination, and vote count.
+    Pages are cached per query for all users, without their votes: `voted_by_me` is set
+    per request from the caller's votes on the page. Responses carry an ETag for conditional requests.
     Args:
-        db (Session): SQLAlchemy session provided by dependency injection.
-        _ : Current authenticated user (not used in this function).
+        request (Request): The incoming request, checked for `If-None-Match`.
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
+        current_user (int): The currently authenticated user, whose votes set `voted_by_me`.
         limit (int): Maximum number of posts to return.
         skip (int): Number of posts to skip for pagination.
-        search (str): Search term to filter posts by title.
+        search (str): Full-text search over title and content, best matches first.
     Returns:
-        List[schemas.PostOut]: List of posts with their vote counts.
-    """
-    posts = (
-        db.query(models.Post, func.count(models.Vote.post_id).label("votes"))
-        .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
-        .group_by(models.Post.id)
-        .filter(models.Post.title.contains(search))
-        .limit(limit)
-        .offset(skip)
-        .all()
-    )
-    return posts
+        Response: JSON list of posts with their vote counts, or 304 Not Modified.
+    """
+    voted = None
+
+    async def load() -> bytes:
+        nonlocal voted
+        query = select_post_out(current_user.id)
+        if search:
+            clause, ranking = _search_filter(search)
+            query = query.where(clause).order_by(*ranking, models.Post.id.desc())
+        else:
+            # Newest first, read from the (created_at, id) index; a stable order keeps skip pages consistent
+            query = query.order_by(models.Post.created_at.desc(), models.Post.id.desc())
+        rows, voted = split_voted_by_me((await db.execute(query.limit(limit).offset(skip))).all())
+        return dump_post_out_list(rows)
+
+    key = f"posts?limit={limit}&skip={skip}&search={search}"
+    body = await response_cache.get_or_load(["posts"], key, load)
+    if voted is None:
+        # Served from the cache, or loaded by a concurrent request of another user; only posts with votes are looked up
+        voted = await _voted_post_ids(db, current_user.id, voted_post_candidates(body))
+    return etag_response(request, overlay_voted_by_me(body, voted))
+
+@router.get("/feed", response_model=schemas.PostPage)
+async def get_feed(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: int = Depends(get_current_user),
+    sort: schemas.PostSort = schemas.PostSort.new,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=10, ge=1, le=100),
+    search: Optional[str] = ""
+):
+    """
+    Retrieve posts with keyset (cursor) pagination.
+    Each page resumes strictly after the sort key of the previous page's last row,
+    so fetching any page costs the same as fetching the first one.
+    Args:
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
+        current_user (int): The currently authenticated user, whose votes set `voted_by_me`.
+        sort (schemas.PostSort): "new" orders by (created_at, id), "top" by (votes, id), both descending.
+        cursor (str): Opaque `next_cursor` from the previous page; omit for the first page.
+        limit (int): Maximum number of posts to return.
+        search (str): Full-text search over title and content.
+    Raises:
+        HTTPException: 400 Bad Request if the cursor is malformed or belongs to another sort order.
+    Returns:
+        Response: JSON `schemas.PostPage` with the posts, their vote counts and the cursor for the next page.
+    """
+    if sort == schemas.PostSort.new:
+        sort_key, key_types = (models.Post.created_at, models.Post.id), [datetime, int]
+    else: # PostSort.top
+        sort_key, key_types = (models.Post.vote_count, models.Post.id), [int, int]
+    query = select_post_out(current_user.id)
+    if search:
+        query = query.where(_search_filter(search)[0])
+    return await _keyset_page(db, query, sort.value, sort_key, key_types, cursor, limit)
+
+@router.get("/hot", response_model=schemas.PostPage)
+async def get_hot_posts(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: int = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=10, ge=1, le=100)
+):
+    """
+    Retrieve posts ranked by their time-decayed hot score, with keyset pagination.
+    Scores are precomputed on every vote, so a page is a range scan of the
+    (hot_score, id) index.
+    Args:
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
+        current_user (int): The currently authenticated user, whose votes set `voted_by_me`.
+        cursor (str): Opaque `next_cursor` from the previous page; omit for the first page.
+        limit (int): Maximum number of posts to return.
+    Raises:
+        HTTPException: 400 Bad Request if the cursor is malformed or belongs to another ranking.
+    Returns:
+        Response: JSON `schemas.PostPage` with the posts, their vote counts and the cursor for the next page.
+    """
+    sort_key = (models.Post.hot_score, models.Post.id)
+    return await _keyset_page(db, select_post_out(current_user.id), "hot", sort_key, [float, int], cursor, limit)
+
+@router.get("/top", response_model=schemas.PostPage)
+async def get_top_posts(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: int = Depends(get_current_user),
+    window: schemas.TopWindow = schemas.TopWindow.day,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=10, ge=1, le=100)
+):
+    """
+    Retrieve the posts with the most votes within a recent window, with keyset pagination.
+    Windowed rankings sum the hourly vote buckets maintained by every vote instead
+    of counting votes; windows are aligned to whole UTC hours. "all" ranks by the
+    total vote count.
+    Args:
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
+        current_user (int): The currently authenticated user, whose votes set `voted_by_me`.
+        window (schemas.TopWindow): Voting window: "1h", "24h", "7d", "30d" or "all".
+        cursor (str): Opaque `next_cursor` from the previous page; omit for the first page.
+        limit (int): Maximum number of posts to return.
+    Raises:
+        HTTPException: 400 Bad Request if the cursor is malformed or belongs to another window.
+    Returns:
+        Response: JSON `schemas.PostPage` with the posts, their total vote counts and the cursor for the next page.
+    """
+    query = select_post_out(current_user.id)
+    if window == schemas.TopWindow.all:
+        sort_key = (models.Post.vote_count, models.Post.id)
+    else:
+        since = func.date_trunc("hour", func.now(), "UTC") - (TOP_WINDOWS[window.value] - timedelta(hours=1))
+        window_votes = func.sum(models.PostVoteHour.votes)
+        ranked = (
+            select(models.PostVoteHour.post_id, window_votes.label("votes"))
+            .where(models.PostVoteHour.hour >= since)
+            .group_by(models.PostVoteHour.post_id)
+            .having(window_votes > 0)
+            .subquery("ranked")
+        )
+        query = query.join(ranked, ranked.c.post_id == models.Post.id)
+        sort_key = (ranked.c.votes, models.Post.id)
+    return await _keyset_page(db, query, f"top:{window.value}", sort_key, [int, int], cursor, limit)
+
+@router.get("/batch", response_model=schemas.PostBatch)
+async def get_posts_batch(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: int = Depends(get_current_user),
+    ids: List[schemas.RowId] = Query(min_length=1)
+):
+    """
+    Retrieve many posts by ID in one query, e.g. to hydrate a list of ids held by a client.
+    The ids are bound as a single array (`WHERE id = ANY(:ids)`), so every batch
+    size shares one statement and query plan.
+    Args:
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
+        current_user (int): The currently authenticated user, whose votes set `voted_by_me`.
+        ids (List[int]): Post ids as repeated `ids` parameters, at most POST_BATCH_MAX_IDS.
+    Raises:
+        HTTPException: 422 if more than POST_BATCH_MAX_IDS ids are requested.
+    Returns:
+        Response: JSON `schemas.PostBatch` with the posts in request order (each id once)
+        and the requested ids that do not exist.
+    """
+    if len(ids) > settings.post_batch_max_ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"At most {settings.post_batch_max_ids} ids per request",
+        )
+    requested = list(dict.fromkeys(ids))
+    id_array = bindparam("ids", requested, type_=postgresql.ARRAY(Integer))
+    rows = (await db.execute(select_post_out(current_user.id).where(models.Post.id == any_(id_array)))).all()
+    posts = {post["Post"]["id"]: post for post in map(post_out, rows)}
+    body = {
+        "items": [posts[id] for id in requested if id in posts],
+        "missing": [id for id in requested if id not in posts],
+    }
+    return Response(content=dump_json(body), media_type="application/json")
 
 @router.get("/{id}", response_model=schemas.PostOut)
-def get_post(id: int, db: Session = Depends(get_db), _ = Depends(get_current_user)):
+async def get_post(
+    id: schemas.RowId,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: int = Depends(get_current_user)
+):
     """
     Retrieve a single post by ID, including vote count.
+    Posts are cached for all users, without their votes: `voted_by_me` is set per request
+    from the caller's vote. Responses carry an ETag for conditional requests.
     Args:
         id (int): The ID of the post to retrieve.
-        db (Session): SQLAlchemy session provided by dependency injection.
-        _ : Current authenticated user (not used in this function).
+        request (Request): The incoming request, checked for `If-None-Match`.
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
+        current_user (int): The currently authenticated user, whose votes set `voted_by_me`.
     Raises:
         HTTPException: 404 Not Found if the post does not exist.
     Returns:
-        schemas.PostOut: The requested post with its vote count.
-    """
-    post = (
-        db.query(models.Post, func.count(models.Vote.post_id).label("votes"))
-        .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
-        .group_by(models.Post.id)
-        .filter(models.Post.id == id)
-        .first()
-    )
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Post with id: {id} was not found"
-        )
-    return post
+        Response: JSON post with its vote count, or 304 Not Modified.
+    """
+    voted = None
+
+    async def load() -> bytes:
+        nonlocal voted
+        result = await db.execute(select_post_out(current_user.id).where(models.Post.id == id))
+        post = result.first()
+        if not post:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Post with id: {id} was not found"
+            )
+        (post,), voted = split_voted_by_me([post])
+        return dump_json(post_out(post))
+
+    body = await response_cache.get_or_load([f"post:{id}"], f"post:{id}", load)
+    if voted is None:
+        voted = await _voted_post_ids(db, current_user.id, voted_post_candidates(body))
+    return etag_response(request, overlay_voted_by_me(body, voted))
 
 @router.put("/{id}", response_model=schemas.Post)
-def update_post(
-    id: int,
+async def update_post(
+    id: schemas.RowId,
     updated_post: schemas.PostCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: int = Depends(get_current_user)
 ):
     """
@@ -98,7 +455,7 @@ def update_post(
     Args:
         id (int): The ID of the post to update.
         updated_post (schemas.PostCreate): The updated post data.
-        db (Session): SQLAlchemy session provided by dependency injection.
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
         current_user (int): The currently authenticated user.
     Raises:
         HTTPException: 404 Not Found if the post does not exist.
@@ -106,8 +463,7 @@ def update_post(
     Returns:
         schemas.Post: The updated post.
     """
-    post_query = db.query(models.Post).filter(models.Post.id == id)
-    post = post_query.first()
+    post = await db.get(models.Post, id, options=[load_owner()])
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -118,21 +474,23 @@ def update_post(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to perform requested action"
         )
-    post_query.update(updated_post.model_dump(), synchronize_session=False)
-    db.commit()
-    return post_query.first()
+    for field, value in updated_post.model_dump().items():
+        setattr(post, field, value)
+    await db.commit()
+    await response_cache.invalidate("posts", f"post:{id}")
+    return post
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(
-    id: int,
-    db: Session = Depends(get_db),
+async def delete_post(
+    id: schemas.RowId,
+    db: AsyncSession = Depends(get_async_db),
     current_user: int = Depends(get_current_user)
 ):
     """
     Delete a post by ID. Only the owner can delete.
     Args:
         id (int): The ID of the post to delete.
-        db (Session): SQLAlchemy session provided by dependency injection.
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
         current_user (int): The currently authenticated user.
     Raises:
         HTTPException: 404 Not Found if the post does not exist.
@@ -140,8 +498,7 @@ def delete_post(
     Returns:
         Response: 204 No Content response on successful deletion.
     """
-    post_query = db.query(models.Post).filter(models.Post.id == id)
-    post = post_query.first()
+    post = await db.get(models.Post, id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -152,6 +509,7 @@ def delete_post(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to perform requested action"
         )
-    post_query.delete(synchronize_session=False)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
+    await response_cache.invalidate("posts", f"post:{id}")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -1,15 +1,17 @@
-from app import models, schemas
-from app.database import get_db
+from app import schemas
+from app.config import settings
+from app.database import get_async_db
 from app.oauth2 import get_current_user
+from app.votes import record_vote, record_votes, vote_buffer, VoteOp
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/vote", tags=['Vote'])
 
 @router.post("/", status_code=status.HTTP_200_OK)
-def vote(
+async def vote(
     vote: schemas.Vote,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: int = Depends(get_current_user)
 ):
     """
@@ -18,7 +20,7 @@ def vote(
     - If `dir` is DOWN, removes the existing vote.
     Args:
         vote (schemas.Vote): The vote data containing post_id and direction.
-        db (Session): SQLAlchemy session provided by dependency injection.
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
         current_user (int): The ID of the currently authenticated user.
     Raises:
         HTTPException: 404 Not Found if the post does not exist.
@@ -26,37 +28,37 @@ def vote(
     Returns:
         dict: A message indicating the result of the vote operation.
     """
-    # Ensure post exists
-    post = db.query(models.Post).filter(models.Post.id == vote.post_id).first()
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Post with id: {vote.post_id} does not exist"
-        )
-    # Check if current user has already voted
-    vote_query = db.query(models.Vote).filter(
-        models.Vote.post_id == vote.post_id,
-        models.Vote.user_id == current_user.id
-    )
-    found_vote = vote_query.first()
-    if vote.dir == schemas.VoteDir.UP:
-        # Prevent duplicate votes
-        if found_vote:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"User {current_user.id} has already voted on post {vote.post_id}"
-            )
-        new_vote = models.Vote(post_id=vote.post_id, user_id=current_user.id)
-        db.add(new_vote)
-        db.commit()
-        return {"message": "Successfully added vote"}
-    else: # VoteDir.DOWN
-        # Ensure a vote exists to remove
-        if not found_vote:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Vote does not exist"
-            )
-        vote_query.delete(synchronize_session=False)
-        db.commit()
-        return {"message": "Successfully deleted vote"}
\ No newline at end of file
+    op = VoteOp(current_user.id, vote.post_id, vote.dir)
+    if settings.vote_write_behind:
+        # Group with concurrent votes into one transaction
+        status_code, detail = await vote_buffer.submit(db, op)
+    else:
+        status_code, detail = await record_vote(db, op)
+    if status_code != status.HTTP_200_OK:
+        raise HTTPException(status_code=status_code, detail=detail)
+    return {"message": detail}
+
+@router.post("/batch", status_code=status.HTTP_200_OK, response_model=schemas.VoteBatchResult)
+async def vote_batch(
+    batch: schemas.VoteBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: int = Depends(get_current_user)
+):
+    """
+    Apply many upvotes and vote removals of the current user in one transaction.
+    Operations are applied in order; each one reports the status code and
+    message the single vote endpoint would have answered with.
+    Args:
+        batch (schemas.VoteBatch): The vote operations.
+        db (AsyncSession): SQLAlchemy session provided by dependency injection.
+        current_user (int): The currently authenticated user.
+    Returns:
+        schemas.VoteBatchResult: Outcome of every operation, in request order.
+    """
+    outcomes = await record_votes(db, [VoteOp(current_user.id, vote.post_id, vote.dir) for vote in batch.votes])
+    return {
+        "results": [
+            {"post_id": vote.post_id, "dir": vote.dir, "status_code": status_code, "detail": detail}
+            for vote, (status_code, detail) in zip(batch.votes, outcomes)
+        ]
+    }
@@ -1,7 +1,10 @@
 from datetime import datetime
 from enum import Enum, IntEnum
-from pydantic import BaseModel, ConfigDict, EmailStr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from typing import Annotated, Dict, List, Optional
+
+# Row ids are Postgres `integer` columns; asyncpg refuses to bind larger values
+RowId = Annotated[int, Field(ge=1, le=2**31 - 1)]
 
 # User Schemas
 class UserCreate(BaseModel):
@@ -42,12 +45,51 @@ class Post(PostBase):
     model_config = ConfigDict(from_attributes=True)
 
 class PostOut(BaseModel):
-    """Schema for returning Post data along with vote count."""
+    """Schema for returning Post data along with vote count and the requesting user's vote state."""
     Post: Post
     votes: int
+    voted_by_me: bool
 
     model_config = ConfigDict(from_attributes=True)
 
+class PostBatch(BaseModel):
+    """Schema for a bulk post read: found posts in request order, and the ids that do not exist."""
+    items: List[PostOut]
+    missing: List[int]
+
+class PostBulkError(BaseModel):
+    """Schema for the validation errors of one rejected item of a bulk post creation."""
+    index: int
+    detail: List[dict]
+
+class PostBulkResult(BaseModel):
+    """Schema for a bulk post creation: the created posts in request order and the rejected items."""
+    created: List[Post]
+    errors: List[PostBulkError]
+
+class PostSort(str, Enum):
+    """Schema for keyset-paginated feed ordering."""
+    new = "new"
+    top = "top"
+
+class TopWindow(str, Enum):
+    """Schema for the voting window of the top ranking."""
+    hour = "1h"
+    day = "24h"
+    week = "7d"
+    month = "30d"
+    all = "all"
+
+class ExportFormat(str, Enum):
+    """Schema for the encoding of a streamed export."""
+    ndjson = "ndjson"
+    csv = "csv"
+
+class PostPage(BaseModel):
+    """Schema for a keyset-paginated page of posts with the cursor for the next page."""
+    items: List[PostOut]
+    next_cursor: Optional[str] = None
+
 # Authentication Schemas
 class Token(BaseModel):
     """JWT token response schema."""
@@ -58,6 +100,18 @@ class TokenData(BaseModel):
     """Schema for JWT payload data extracted from token."""
     id: Optional[str] = None
 
+class CurrentUser(BaseModel):
+    """
+    Schema for the authenticated principal of a request.
+    Immutable so a single instance can be shared through the user cache;
+    email and created_at are unset when the principal is built from token claims.
+    """
+    id: int
+    email: Optional[EmailStr] = None
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
 # Vote Schemas
 class VoteDir(IntEnum):
     """
@@ -69,18 +123,71 @@ class VoteDir(IntEnum):
 
 class Vote(BaseModel):
     """Schema for vote request."""
-    post_id: int
+    post_id: RowId
     dir: VoteDir
 
+class VoteBatch(BaseModel):
+    """Schema for a batch of vote requests applied in one transaction."""
+    votes: List[Vote] = Field(min_length=1, max_length=1000)
+
+class VoteResult(Vote):
+    """Schema for the outcome of one vote in a batch, mirroring the single vote endpoint."""
+    status_code: int
+    detail: str
+
+class VoteBatchResult(BaseModel):
+    """Schema for the outcomes of a vote batch, in request order."""
+    results: List[VoteResult]
+
 # Health Check Schemas
 class DatabaseStatus(str, Enum):
     """Schema for database connectivity status."""
     connected = "connected"
     unreachable = "unreachable"
+    unknown = "unknown"
+
+class CacheStats(BaseModel):
+    """Schema for cache size and hit/miss counters (size is unknown for shared backends)."""
+    size: Optional[int] = None
+    maxsize: Optional[int] = None
+    hits: int
+    misses: int
+    hit_ratio: float
+
+class PoolStatus(BaseModel):
+    """Schema for connection pool usage and checkout wait statistics."""
+    mode: str
+    size: Optional[int] = None
+    capacity: Optional[int] = None
+    overflow: Optional[int] = None
+    checked_out: int
+    saturation: Optional[float] = None
+    checkouts: int
+    timeouts: int
+    wait_seconds_avg: float
+    wait_seconds_max: float
 
 class HealthStatus(BaseModel):
     """Schema for overall health status of the application."""
     status: str
     uptime_seconds: int
     version: str
-    database: DatabaseStatus
\ No newline at end of file
+    database: DatabaseStatus
+    pool: PoolStatus
+    caches: Dict[str, CacheStats]
+
+class LivenessStatus(BaseModel):
+    """Schema for the liveness probe, answered without touching the database."""
+    status: str
+    uptime_seconds: int
+    version: str
+
+class ReadinessStatus(BaseModel):
+    """Schema for the readiness probe, served from the latest background database check."""
+    status: str
+    database: DatabaseStatus
+    last_checked_at: Optional[datetime] = None
+    last_check_latency_ms: Optional[float] = None
+    consecutive_failures: int
+    last_error: Optional[str] = None
+    pool: PoolStatus
\ No newline at end of file
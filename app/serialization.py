@@ -0,0 +1,139 @@
+from app import models
+from sqlalchemy import and_, select
+from sqlalchemy.orm import joinedload, selectinload
+from typing import Collection, Iterable, List, Literal, Optional, Set, Tuple
+import orjson
+
+# Eager loading strategies for `Post.owner`
+OwnerLoading = Literal["joined", "selectin"]
+
+# Owner columns exposed by `schemas.UserOut`; the password hash is never loaded
+OWNER_COLUMNS = (models.User.id, models.User.email, models.User.created_at)
+
+# Columns of a PostOut row, in the order `post_out` reads them
+POST_OUT_COLUMNS = (
+    models.Post.title,
+    models.Post.content,
+    models.Post.published,
+    models.Post.id,
+    models.Post.created_at,
+    models.Post.owner_id,
+    *OWNER_COLUMNS,
+    models.Post.vote_count,
+    # Set when the LEFT JOIN of `select_post_out` found the requesting user's vote
+    models.Vote.user_id.is_not(None).label("voted_by_me"),
+)
+# Position of `models.Post.id` in a PostOut row
+_POST_ID = 3
+
+def select_post_out(user_id: int):
+    """
+    Select the columns of `schemas.PostOut` as plain tuples, joined to the post owner
+    and LEFT JOINed to the requesting user's vote. The vote join probes the
+    (user_id, post_id) primary key of `votes` once per post, so it stays cheap at
+    any table size. Skips ORM identity-map hydration and per-row schema
+    validation; the row layout matches `POST_OUT_COLUMNS`.
+    Args:
+        user_id (int): The requesting user, whose votes set `voted_by_me`.
+    Returns:
+        Select: The query, to be filtered, ordered and limited by the caller.
+    """
+    return (
+        select(*POST_OUT_COLUMNS)
+        .join(models.User, models.User.id == models.Post.owner_id)
+        .outerjoin(models.Vote, and_(models.Vote.post_id == models.Post.id, models.Vote.user_id == user_id))
+    )
+
+def load_owner(strategy: OwnerLoading = "joined"):
+    """
+    Loader option eager-loading `Post.owner` for ORM queries, limited to `OWNER_COLUMNS`.
+    Args:
+        strategy (OwnerLoading): "joined" adds a LEFT OUTER JOIN to the post query, suited to
+            single posts; "selectin" loads the owners of all rows in one extra
+            `WHERE id IN (...)` query, avoiding repeated owner columns on large pages.
+    Returns:
+        Load: The option to pass to `Select.options` or `Session.get`.
+    """
+    loader = {"joined": joinedload, "selectin": selectinload}[strategy]
+    return loader(models.Post.owner).load_only(*OWNER_COLUMNS)
+
+def post_document(row) -> dict:
+    """
+    Build the `schemas.Post` document of a row of post and owner columns.
+    Args:
+        row (Row): The title, content, published, id, created_at and owner_id of a post, then `OWNER_COLUMNS`.
+    Returns:
+        dict: The post with its owner.
+    """
+    title, content, published, id, created_at, owner_id, user_id, email, user_created_at = row
+    return {
+        "title": title,
+        "content": content,
+        "published": published,
+        "id": id,
+        "created_at": created_at,
+        "owner_id": owner_id,
+        "owner": {"id": user_id, "email": email, "created_at": user_created_at},
+    }
+
+def post_out(row) -> dict:
+    """
+    Build the `schemas.PostOut` document of a `select_post_out` row.
+    Args:
+        row (Row): A row of `POST_OUT_COLUMNS`.
+    Returns:
+        dict: The post with its owner, vote count and whether the requesting user voted on it.
+    """
+    *post, votes, voted_by_me = row
+    return {"Post": post_document(post), "votes": votes, "voted_by_me": voted_by_me}
+
+def split_voted_by_me(rows: Iterable) -> Tuple[List[tuple], Set[int]]:
+    """
+    Separate the requesting user's votes from `select_post_out` rows, so the rows
+    can be serialized once for every user and `voted_by_me` set per request.
+    Args:
+        rows (Iterable[Row]): Rows of `POST_OUT_COLUMNS`.
+    Returns:
+        tuple: The rows with `voted_by_me` False, and the ids of the posts the user voted on.
+    """
+    shared, voted = [], set()
+    for row in rows:
+        *post, voted_by_me = row
+        shared.append((*post, False))
+        if voted_by_me:
+            voted.add(post[_POST_ID])
+    return shared, voted
+
+def voted_post_candidates(body: bytes) -> List[int]:
+    """List the ids of the posts with votes in a serialized `schemas.PostOut`, or list of them."""
+    document = orjson.loads(body)
+    posts = document if isinstance(document, list) else [document]
+    return [post["Post"]["id"] for post in posts if post["votes"]]
+
+def overlay_voted_by_me(body: bytes, voted: Collection[int]) -> bytes:
+    """
+    Set `voted_by_me` on a serialized `schemas.PostOut`, or list of them, built without the user's votes.
+    Args:
+        body (bytes): The serialized post or posts, with `voted_by_me` False.
+        voted (Collection[int]): Ids of the posts the requesting user voted on.
+    Returns:
+        bytes: The body with the user's votes, unchanged (not re-serialized) if there are none.
+    """
+    if not voted:
+        return body
+    document = orjson.loads(body)
+    for post in document if isinstance(document, list) else [document]:
+        post["voted_by_me"] = post["Post"]["id"] in voted
+    return dump_json(document)
+
+def dump_json(document) -> bytes:
+    """Encode a document with orjson, writing UTC datetimes with a "Z" suffix like Pydantic."""
+    return orjson.dumps(document, option=orjson.OPT_UTC_Z)
+
+def dump_post_out_list(rows: Iterable) -> bytes:
+    """Serialize `select_post_out` rows as a JSON list of `schemas.PostOut`."""
+    return dump_json([post_out(row) for row in rows])
+
+def dump_post_page(rows: Iterable, next_cursor: Optional[str]) -> bytes:
+    """Serialize `select_post_out` rows as a JSON `schemas.PostPage`."""
+    return dump_json({"items": [post_out(row) for row in rows], "next_cursor": next_cursor})
@@ -1,7 +1,77 @@
+from app.config import Lazy, settings
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from typing import Optional, Tuple
+import asyncio
+import threading
 
-# Initialize a recommended password hashing instance
-_password_hasher = PasswordHash.recommended()
+# Initialize the password hashing instance from the configured Argon2 parameters
+_password_hasher = Lazy(lambda: PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.password_hash_time_cost,
+        memory_cost=settings.password_hash_memory_cost,
+        parallelism=settings.password_hash_parallelism,
+    ),
+)))
+
+class BoundedExecutor:
+    """
+    Thread pool that rejects new work once `max_pending` calls are running or queued.
+    Argon2 releases the GIL while hashing, so threads give real parallelism here.
+    """
+    def __init__(self, max_workers: int, max_pending: int, thread_name_prefix: str):
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+    @property
+    def pending(self) -> int:
+        """Number of calls currently running or waiting for a worker."""
+        return self._pending
+
+    async def run(self, fn, *args):
+        """
+        Run `fn(*args)` on the pool without blocking the event loop.
+        The call counts as pending until it finishes on its thread, even if the
+        awaiting request is cancelled first.
+        Raises:
+            HTTPException: 503 Service Unavailable if the queue is full.
+        Returns:
+            Any: The result of `fn`.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self):
+        """Stop accepting work; calls already submitted still finish on their threads."""
+        self._executor.shutdown(wait=False)
+
+# Dedicated, size-limited pool so a burst of logins cannot starve other routes
+password_hash_executor = Lazy(lambda: BoundedExecutor(
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_workers + settings.password_hash_queue_limit,
+    thread_name_prefix="password-hash",
+), dispose=BoundedExecutor.shutdown)
 
 def get_password_hash(password: str) -> str:
     """
@@ -22,4 +92,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True if the password matches, False otherwise.
     """
-    return _password_hasher.verify(plain_password, hashed_password)
\ No newline at end of file
+    return _password_hasher.verify(plain_password, hashed_password)
+
+async def hash_password(password: str) -> str:
+    """
+    Hash a password on the bounded password-hash pool.
+    Args:
+        password (str): The plain-text password to hash.
+    Raises:
+        HTTPException: 503 Service Unavailable if the hashing queue is full.
+    Returns:
+        str: The hashed password.
+    """
+    return await password_hash_executor.run(_password_hasher.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the bounded password-hash pool and rehash outdated hashes.
+    Args:
+        plain_password (str): The plain-text password provided by the user.
+        hashed_password (str): The stored hashed password to compare against.
+    Raises:
+        HTTPException: 503 Service Unavailable if the hashing queue is full.
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the password matches, and a new hash
+        if the stored one was made with different Argon2 parameters.
+    """
+    return await password_hash_executor.run(_password_hasher.verify_and_update, plain_password, hashed_password)
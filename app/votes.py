@@ -0,0 +1,322 @@
+from app import models, schemas
+from app.cache import response_cache
+from app.config import Lazy, settings
+from app.ranking import hot_score, vote_hour
+from collections import Counter, defaultdict
+from datetime import datetime
+from fastapi import status
+from sqlalchemy import bindparam, column, delete, func, Integer, literal, select, text, TIMESTAMP, update, values
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import TextClause
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import asyncio
+
+class VoteOp(NamedTuple):
+    """A single vote operation of one user on one post."""
+    user_id: int
+    post_id: int
+    dir: schemas.VoteDir
+
+# HTTP status and message reported back for each vote operation
+VoteOutcome = Tuple[int, str]
+
+def _outcome(op: VoteOp, applied: bool, post_found: bool) -> VoteOutcome:
+    """Map the result of a vote write to the vote endpoint's status code and message."""
+    if applied:
+        message = "Successfully added vote" if op.dir == schemas.VoteDir.UP else "Successfully deleted vote"
+        return status.HTTP_200_OK, message
+    if not post_found:
+        return status.HTTP_404_NOT_FOUND, f"Post with id: {op.post_id} does not exist"
+    if op.dir == schemas.VoteDir.UP:
+        return status.HTTP_409_CONFLICT, f"User {op.user_id} has already voted on post {op.post_id}"
+    return status.HTTP_404_NOT_FOUND, "Vote does not exist"
+
+def _single_vote_statement(direction: schemas.VoteDir):
+    """
+    Build the one-statement vote write for a direction, parametrized by `user_id` and `post_id`.
+    The vote insert (`ON CONFLICT DO NOTHING`) or delete, the counter and hot
+    score update and the hourly vote bucket upsert run as chained data-modifying
+    CTEs; the statement also reports whether the post exists, so no
+    check-then-write queries (and no race between them) are needed.
+    """
+    delta = 1 if direction == schemas.VoteDir.UP else -1
+    user_id, post_id = bindparam("user_id", type_=Integer), bindparam("post_id", type_=Integer)
+    if direction == schemas.VoteDir.UP:
+        # Selecting from posts inserts nothing for a missing post instead of violating the foreign key
+        write = (
+            insert(models.Vote)
+            .from_select(["user_id", "post_id"], select(user_id, models.Post.id).where(models.Post.id == post_id))
+            .on_conflict_do_nothing()
+            .returning(models.Vote.post_id, models.Vote.created_at)
+            .cte("new_vote")
+        )
+    else: # VoteDir.DOWN
+        write = (
+            delete(models.Vote)
+            .where(models.Vote.user_id == user_id, models.Vote.post_id == post_id)
+            .returning(models.Vote.post_id, models.Vote.created_at)
+            .cte("old_vote")
+        )
+    counted = (
+        update(models.Post)
+        .where(models.Post.id == write.c.post_id)
+        .values(
+            vote_count=models.Post.vote_count + delta,
+            hot_score=hot_score(models.Post.vote_count + delta, models.Post.created_at),
+        )
+        .returning(models.Post.id)
+        .cte("counted")
+    )
+    # Selecting from `counted` chains the CTEs, so SQLAlchemy renders all of them
+    bucket = insert(models.PostVoteHour).from_select(
+        ["post_id", "hour", "votes"],
+        select(counted.c.id, vote_hour(write.c.created_at), literal(delta)).join(write, write.c.post_id == counted.c.id),
+    )
+    bucketed = (
+        bucket.on_conflict_do_update(
+            index_elements=["post_id", "hour"],
+            set_={"votes": models.PostVoteHour.votes + bucket.excluded.votes},
+        )
+        .returning(models.PostVoteHour.post_id)
+        .cte("bucketed")
+    )
+    return select(
+        select(bucketed.c.post_id).exists().label("applied"),
+        select(models.Post.id).where(models.Post.id == post_id).exists().label("post_found"),
+    )
+
+def _precompiled(statement) -> TextClause:
+    """
+    Render a statement to SQL text once, keeping its bound parameters and their types.
+    SQLAlchemy does not cache the compilation of Postgres `INSERT ... ON CONFLICT`
+    constructs, so executing one recompiles the whole statement on every call;
+    textual statements are cached like any other.
+    """
+    compiled = statement.compile(dialect=postgresql.dialect(paramstyle="named"))
+    return text(compiled.string).bindparams(*(
+        bindparam(name, value=param.value, type_=param.type) for param, name in compiled.bind_names.items()
+    ))
+
+# Built and compiled once: constructing and compiling the CTEs costs more than executing them
+_SINGLE_VOTE_STATEMENTS = {
+    direction: _precompiled(_single_vote_statement(direction)) for direction in schemas.VoteDir
+}
+
+async def record_vote(db: AsyncSession, op: VoteOp) -> VoteOutcome:
+    """
+    Apply one vote operation in a single statement and commit it.
+    Args:
+        db (AsyncSession): SQLAlchemy session used for the write; committed on return.
+        op (VoteOp): The vote operation.
+    Returns:
+        VoteOutcome: Status code and message for the operation.
+    """
+    try:
+        applied, post_found = (await db.execute(
+            _SINGLE_VOTE_STATEMENTS[op.dir], {"user_id": op.user_id, "post_id": op.post_id}
+        )).one()
+    except IntegrityError:
+        # The post was deleted after the statement's snapshot was taken
+        await db.rollback()
+        return _outcome(op, False, False)
+    await db.commit()
+    if applied:
+        await response_cache.invalidate("posts", f"post:{op.post_id}")
+    return _outcome(op, applied, post_found)
+
+def _pairs(ops: List[VoteOp], name: str):
+    """Inline (user_id, post_id) rows as a VALUES list usable as a table."""
+    return values(column("user_id", Integer), column("post_id", Integer), name=name).data(
+        [(op.user_id, op.post_id) for op in ops]
+    )
+
+async def record_votes(db: AsyncSession, ops: List[VoteOp]) -> List[VoteOutcome]:
+    """
+    Apply many vote operations in a single transaction.
+    Upvotes run as one `INSERT ... ON CONFLICT DO NOTHING`, removals as one
+    `DELETE ... USING`, and vote counters, hot scores and hourly vote buckets
+    get one aggregated write each, instead of a lookup, a write and a commit
+    per vote. Repeated operations on the same
+    (user, post) pair are applied in order, one statement round per repetition.
+    Args:
+        db (AsyncSession): SQLAlchemy session used for the writes; committed on return.
+        ops (List[VoteOp]): Vote operations in submission order.
+    Returns:
+        List[VoteOutcome]: Per operation, the status code and message the single
+        vote endpoint would have answered with.
+    """
+    # Split operations into rounds holding each (user, post) pair at most once
+    rounds: List[List[int]] = []
+    seen = Counter()
+    for index, op in enumerate(ops):
+        position = seen[(op.user_id, op.post_id)]
+        seen[(op.user_id, op.post_id)] += 1
+        if position == len(rounds):
+            rounds.append([])
+        rounds[position].append(index)
+
+    applied = [False] * len(ops)
+    deltas: Dict[int, int] = defaultdict(int)
+    hour_deltas: Dict[Tuple[int, datetime], int] = defaultdict(int)
+    for indexes in rounds:
+        ups = [ops[i] for i in indexes if ops[i].dir == schemas.VoteDir.UP]
+        downs = [ops[i] for i in indexes if ops[i].dir == schemas.VoteDir.DOWN]
+        done = set()
+        if ups:
+            # Joining posts skips missing posts instead of failing the batch on the foreign key
+            pairs = _pairs(ups, "new_votes")
+            result = await db.execute(
+                insert(models.Vote)
+                .from_select(
+                    ["user_id", "post_id"],
+                    select(pairs.c.user_id, pairs.c.post_id).join(models.Post, models.Post.id == pairs.c.post_id),
+                )
+                .on_conflict_do_nothing()
+                .returning(models.Vote.user_id, models.Vote.post_id, vote_hour(models.Vote.created_at))
+            )
+            for user_id, post_id, hour in result.all():
+                done.add((user_id, post_id, schemas.VoteDir.UP))
+                deltas[post_id] += 1
+                hour_deltas[(post_id, hour)] += 1
+        if downs:
+            pairs = _pairs(downs, "old_votes")
+            result = await db.execute(
+                delete(models.Vote)
+                .where(models.Vote.user_id == pairs.c.user_id, models.Vote.post_id == pairs.c.post_id)
+                .returning(models.Vote.user_id, models.Vote.post_id, vote_hour(models.Vote.created_at))
+            )
+            for user_id, post_id, hour in result.all():
+                done.add((user_id, post_id, schemas.VoteDir.DOWN))
+                deltas[post_id] -= 1
+                hour_deltas[(post_id, hour)] -= 1
+        for i in indexes:
+            applied[i] = (ops[i].user_id, ops[i].post_id, ops[i].dir) in done
+
+    changed = sorted(post_id for post_id, delta in deltas.items() if delta)
+    counter = None
+    if changed:
+        # Sorted rows keep the row lock order stable across concurrent batches
+        counts = values(column("post_id", Integer), column("delta", Integer), name="deltas").data(
+            [(post_id, deltas[post_id]) for post_id in changed]
+        )
+        counter = (
+            update(models.Post)
+            .where(models.Post.id == counts.c.post_id)
+            .values(
+                vote_count=models.Post.vote_count + counts.c.delta,
+                hot_score=hot_score(models.Post.vote_count + counts.c.delta, models.Post.created_at),
+            )
+        )
+    buckets = sorted(key for key, delta in hour_deltas.items() if delta)
+    if buckets:
+        hours = values(
+            column("post_id", Integer), column("hour", TIMESTAMP(timezone=True)), column("votes", Integer),
+            name="hour_deltas",
+        ).data([(post_id, hour, hour_deltas[(post_id, hour)]) for post_id, hour in buckets])
+        rows = select(hours)
+        if counter is not None:
+            # Update the counters in the same round trip. The uncorrelated count runs
+            # before the first bucket row, so post rows are locked first as in single votes.
+            counted = counter.returning(models.Post.id).cte("counted")
+            rows = rows.where(select(func.count()).select_from(counted).scalar_subquery() >= 0)
+            counter = None
+        bucket = insert(models.PostVoteHour).from_select(["post_id", "hour", "votes"], rows)
+        await db.execute(bucket.on_conflict_do_update(
+            index_elements=["post_id", "hour"],
+            set_={"votes": models.PostVoteHour.votes + bucket.excluded.votes},
+        ))
+    if counter is not None:
+        await db.execute(counter.execution_options(synchronize_session=False))
+    # Tell a missing post apart from a duplicate or missing vote only when something failed
+    failed = {ops[i].post_id for i in range(len(ops)) if not applied[i]}
+    existing = set()
+    if failed:
+        existing = set((await db.scalars(select(models.Post.id).where(models.Post.id.in_(failed)))).all())
+    await db.commit()
+    if deltas:
+        await response_cache.invalidate("posts", *(f"post:{post_id}" for post_id in deltas))
+
+    return [_outcome(op, ok, op.post_id in existing) for op, ok in zip(ops, applied)]
+
+class _PendingBatch:
+    """Votes gathered by a VoteBuffer leader, the task writing them and the future carrying their outcomes."""
+    def __init__(self):
+        self.ops: List[VoteOp] = []
+        self.full = asyncio.Event()
+        self.flush: Optional[asyncio.Task] = None
+        self.done = asyncio.get_running_loop().create_future()
+        # Consume the exception when no follower awaits it, so it is not logged as unretrieved
+        self.done.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+class VoteBuffer:
+    """
+    Write-behind buffer grouping single votes into one transaction.
+    The first vote of a batch becomes its leader: it waits up to `window`
+    seconds (or until `max_size` votes arrived), then writes the whole batch
+    with its own session through `record_votes`. Later votes only await the
+    outcome of their own operation, so every caller still gets its 404/409.
+    The batch is written by a separate task, so a cancelled caller (e.g. a
+    disconnected client) never cancels or fails the other callers' votes.
+    """
+    def __init__(self, window: float, max_size: int):
+        self.window = window
+        self.max_size = max_size
+        self._batch: Optional[_PendingBatch] = None
+
+    async def submit(self, db: AsyncSession, op: VoteOp) -> VoteOutcome:
+        """
+        Queue a vote and wait until its batch is written.
+        Args:
+            db (AsyncSession): The caller's session, used if the caller leads the batch.
+            op (VoteOp): The vote operation.
+        Returns:
+            VoteOutcome: Status code and message for this operation.
+        """
+        batch = self._batch
+        leader = batch is None
+        if leader:
+            batch = self._batch = _PendingBatch()
+        index = len(batch.ops)
+        batch.ops.append(op)
+        if len(batch.ops) >= self.max_size:
+            batch.full.set()
+            self._batch = None
+        if leader:
+            batch.flush = asyncio.ensure_future(self._flush(db, batch))
+        try:
+            return (await asyncio.shield(batch.done))[index]
+        except asyncio.CancelledError:
+            # The batch is written with the leader's session: keep it open until the write ends
+            while leader and not batch.flush.done():
+                try:
+                    await asyncio.wait([batch.flush])
+                except asyncio.CancelledError:
+                    pass
+            raise
+
+    async def _flush(self, db: AsyncSession, batch: _PendingBatch):
+        """Wait for the batch to fill or its window to pass, write it, and publish the outcomes."""
+        try:
+            try:
+                await asyncio.wait_for(batch.full.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            if self._batch is batch:
+                self._batch = None
+            outcomes = await record_votes(db, batch.ops)
+        except asyncio.CancelledError:
+            if self._batch is batch:
+                self._batch = None
+            batch.done.cancel()
+        except Exception as error:
+            if self._batch is batch:
+                self._batch = None
+            batch.done.set_exception(error)
+        else:
+            batch.done.set_result(outcomes)
+
+# Shared buffer used by the single vote endpoint when write-behind is enabled
+vote_buffer = Lazy(lambda: VoteBuffer(settings.vote_write_behind_window_seconds, settings.vote_write_behind_max_size))
@@ -0,0 +1,73 @@
+"""
+Post creation throughput: one `POST /posts/` per post vs. `POST /posts/bulk` batches.
+
+Requests go through the app in process (routing, validation, auth and
+serialization included) for `--duration` seconds per mode. The single-post
+path costs an INSERT, a COMMIT and a reload per post; a bulk request inserts
+its whole batch with one statement and one COMMIT. Benchmark posts are
+deleted afterwards.
+
+Usage:
+    python benchmarks/bench_bulk_posts.py [--duration 5] [--batch-sizes 10 100 1000]
+"""
+from app.database import SessionLocal
+from app.main import app
+from app.oauth2 import create_access_token
+from sqlalchemy import text
+import argparse
+import asyncio
+import httpx
+import time
+
+def seed_user() -> int:
+    """Create (or reuse) the benchmark user and return its id."""
+    with SessionLocal() as db:
+        user_id = db.execute(text(
+            "INSERT INTO users (email, password) VALUES ('bench-bulk-posts@example.com', 'x') "
+            "ON CONFLICT (email) DO UPDATE SET email = EXCLUDED.email RETURNING id"
+        )).scalar_one()
+        db.commit()
+    return user_id
+
+def cleanup(user_id: int):
+    """Delete the benchmark user's posts."""
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM posts WHERE owner_id = :user_id"), {"user_id": user_id})
+        db.commit()
+
+async def run_mode(client, batch_size: int, duration: float) -> float:
+    """Create posts for `duration` seconds, one per request or `batch_size` per bulk request; return posts per second."""
+    created = 0
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        posts = [{"title": f"bulk post {created + i}", "content": "bulk benchmark"} for i in range(batch_size)]
+        if batch_size == 1:
+            response = await client.post("/posts/", json=posts[0])
+        else:
+            response = await client.post("/posts/bulk", json=posts)
+        response.raise_for_status()
+        created += batch_size
+    return created / (time.perf_counter() - start)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    user_id = seed_user()
+    headers = {"Authorization": f"Bearer {create_access_token({'user_id': user_id})}"}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            print(f"{args.duration:.0f}s per mode\n")
+            print(f"{'mode':<18} {'posts/s':>9}")
+            for batch_size in (1, *args.batch_sizes):
+                mode = "single" if batch_size == 1 else f"bulk x {batch_size}"
+                print(f"{mode:<18} {await run_mode(client, batch_size, args.duration):>9.0f}")
+    finally:
+        cleanup(user_id)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Per-request cost of the rate limiting middleware.
+
+Calls `RateLimitMiddleware` directly with synthetic ASGI requests in front of
+a no-op app, so only the limiter's own work is timed: route lookup, client
+key extraction (client IP, or the JWT user through the verified-token cache)
+and the GCRA check. Requests rotate over `--clients` clients and the rates
+are high enough that none is rejected. The redis mode only runs with
+`--redis-url`, and then includes the network round-trip to that server.
+
+Usage:
+    python benchmarks/bench_ratelimit.py [--requests 100000] [--clients 10000] [--redis-url redis://localhost:6379/0]
+"""
+from app.oauth2 import create_access_token
+from app.ratelimit import MemoryRateLimiter, Policy, Rate, RateLimitMiddleware, RedisRateLimiter
+import argparse
+import asyncio
+import time
+
+RATE = Rate(10**9, 1.0)
+
+async def noop_app(scope, receive, send):
+    """Downstream app doing nothing, standing in for the routes."""
+
+async def noop_send(message):
+    pass
+
+def scopes(path: str, clients: int, user: bool) -> list:
+    """Build one synthetic request scope per client."""
+    requests = []
+    for client in range(clients):
+        headers = [(b"authorization", f"Bearer {create_access_token({'user_id': client})}".encode())] if user else []
+        requests.append({
+            "type": "http",
+            "method": "POST",
+            "path": path,
+            "query_string": b"",
+            "headers": headers,
+            "client": (f"10.0.{client // 256 % 256}.{client % 256}", 50000),
+        })
+    return requests
+
+async def per_request_us(app, requests: list, count: int) -> float:
+    """Send `count` requests through an ASGI app, cycling over `requests`; returns the mean cost in microseconds."""
+    for scope in requests:  # warm up the token cache and the limiter state
+        await app(scope, None, noop_send)
+    start = time.perf_counter()
+    for i in range(count):
+        await app(requests[i % len(requests)], None, noop_send)
+    return (time.perf_counter() - start) / count * 1e6
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--redis-url")
+    args = parser.parse_args()
+
+    policies = [
+        Policy("ip", "POST", ("/ip",), RATE, "ip"),
+        Policy("user", "POST", ("/user",), RATE, "user"),
+    ]
+    limiters = {"memory": MemoryRateLimiter(maxsize=args.clients)}
+    if args.redis_url:
+        from redis.asyncio import Redis
+        limiters["redis"] = RedisRateLimiter(Redis.from_url(args.redis_url), prefix="chirp:bench-ratelimit:")
+    ip_requests = scopes("/ip", args.clients, user=False)
+    user_requests = scopes("/user", args.clients, user=True)
+
+    baseline = await per_request_us(noop_app, ip_requests, args.requests)
+    print(f"{args.requests} requests over {args.clients} clients\n")
+    print(f"{'mode':<28} {'us/request':>11} {'overhead (us)':>14}")
+    print(f"{'no middleware':<28} {baseline:>11.2f} {'-':>14}")
+    rows = [("no policy for the route", "memory", scopes("/other", args.clients, user=False))]
+    for name in limiters:
+        rows += [(f"{name}, keyed on IP", name, ip_requests), (f"{name}, keyed on JWT user", name, user_requests)]
+    for mode, name, requests in rows:
+        middleware = RateLimitMiddleware(noop_app, limiters[name], policies)
+        # Fewer round-trips to a real server keep the run short
+        count = args.requests if name == "memory" else args.requests // 10
+        cost = await per_request_us(middleware, requests, count)
+        print(f"{mode:<28} {cost:>11.2f} {cost - baseline:>14.2f}")
+    for limiter in limiters.values():
+        await limiter.clear()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Post search latency: legacy `title LIKE '%term%'` vs. full-text search with trigram fallback.
+
+Seeds a synthetic corpus (1M posts by default) into the configured database,
+then times each query shape for common, rare and misspelled terms. Words follow
+a skewed distribution over a 20k-word vocabulary, so common terms match a few
+percent of posts. The legacy query runs with index scans disabled to reproduce
+the sequential scan it performed before the trigram index existed.
+
+Usage:
+    python benchmarks/bench_search.py --seed [--posts 1000000] [--repeat 20]
+"""
+from app import models
+from app.database import engine
+from app.routers.post import _search_filter
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+import argparse
+import statistics
+import time
+
+VOCABULARY = (
+    "apple river mountain coffee python market music garden winter summer planet ocean "
+    "engine window silver forest travel camera bridge castle dragon pizza rocket puzzle "
+    "library thunder candle harbor meadow pepper violin desert island jungle lantern "
+    "marble orbit parade quartz saddle tunnel velvet walnut yellow zebra anchor breeze "
+    "canyon dolphin ember falcon glacier horizon igloo jasmine kettle lagoon magnet nectar"
+).split()
+VOCABULARY_SIZE = 20000
+RARE_TERM = "zymurgy"
+
+def seed(db: Session, posts: int):
+    """Insert `posts` synthetic posts owned by a dedicated benchmark user."""
+    words = "ARRAY[" + ",".join(f"'{word}'" for word in VOCABULARY) + "]"
+    # Real words head the vocabulary and are drawn far more often than the synthetic tail
+    word = f"vocab.words[1 + floor(power(random(), 3) * {VOCABULARY_SIZE})::int]"
+    sentence = lambda count: " || ' ' || ".join([word] * count)
+    owner_id = db.execute(text(
+        "INSERT INTO users (email, password) VALUES ('bench-search@example.com', 'x') "
+        "ON CONFLICT (email) DO UPDATE SET email = EXCLUDED.email RETURNING id"
+    )).scalar_one()
+    db.execute(text(
+        f"WITH vocab AS ("
+        f"  SELECT {words} || array_agg('w' || i) AS words"
+        f"  FROM generate_series({len(VOCABULARY) + 1}, {VOCABULARY_SIZE}) AS i"
+        f") "
+        f"INSERT INTO posts (title, content, owner_id) "
+        f"SELECT {sentence(4)}, {sentence(16)}, :owner_id FROM generate_series(1, :posts), vocab"
+    ), {"owner_id": owner_id, "posts": posts})
+    # A handful of posts carry a rare term so selective searches have something to find
+    db.execute(text(
+        "INSERT INTO posts (title, content, owner_id) "
+        "SELECT 'notes on ' || :term, 'homebrew ' || :term || ' log', :owner_id FROM generate_series(1, 50)"
+    ), {"owner_id": owner_id, "term": RARE_TERM})
+    db.commit()
+    db.execute(text("ANALYZE posts"))
+
+def time_query(db: Session, statement, repeat: int, sequential: bool = False) -> float:
+    """Return the median wall-clock latency of `statement` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        if sequential:
+            db.execute(text("SET LOCAL enable_bitmapscan = off"))
+            db.execute(text("SET LOCAL enable_indexscan = off"))
+        start = time.perf_counter()
+        db.execute(statement).all()
+        samples.append((time.perf_counter() - start) * 1000)
+        db.rollback()
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="insert the synthetic corpus first")
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        if args.seed:
+            start = time.perf_counter()
+            seed(db, args.posts)
+            print(f"Seeded {args.posts} posts in {time.perf_counter() - start:.1f}s")
+        total = db.execute(text("SELECT count(*) FROM posts")).scalar_one()
+        print(f"Corpus: {total} posts\n")
+        print(f"{'term':<12} {'legacy LIKE (ms)':>18} {'full-text (ms)':>16}")
+        for term in ("pizza", RARE_TERM, "dolphn"):
+            legacy = select(models.Post.id).where(models.Post.title.contains(term)).limit(10)
+            clause, ranking = _search_filter(term)
+            search = select(models.Post.id).where(clause).order_by(*ranking, models.Post.id.desc()).limit(10)
+            legacy_ms = time_query(db, legacy, args.repeat, sequential=True)
+            print(f"{term:<12} {legacy_ms:>18.2f} {time_query(db, search, args.repeat):>16.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Import and cold-start latency of the app, and what preloading saves a forked worker.
+
+Every run is a fresh interpreter, so nothing is cached across runs. A cold
+process times, in order: `import app.main`, `create_app()`, its first
+`/health/live` response (which builds the middleware stack and reads the
+settings, and creates the engine and imports its driver for the pool metrics)
+and its first `/health` response (which opens the first connection). A
+preloaded process does the import, app and engine work up front like the
+gunicorn master (see gunicorn.conf.py), then forks; the child times its first
+`/health/live` and `/health` responses from the fork, as a worker would. Requests go through httpx.ASGITransport,
+without a server, and medians over `--runs` are reported. With
+`--importtime`, the slowest modules of `python -X importtime` are listed.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--importtime 15]
+"""
+import argparse
+import asyncio
+import httpx
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Phases measured by each probe, in order
+PHASES = {
+    "cold": ["import app.main", "create_app()", "first /health/live", "first /health"],
+    "preloaded": ["fork -> first /health/live", "fork -> first /health"],
+}
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+async def _first_response_ms(app, path: str) -> float:
+    """Time a request through the app; exits if it does not succeed."""
+    start = time.perf_counter()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://startup") as client:
+        response = await client.get(path)
+    if response.is_error:
+        sys.exit(f"GET {path} answered {response.status_code}: {response.text}")
+    return _elapsed_ms(start)
+
+def probe(mode: str):
+    """Run one measurement in this (fresh) process and print its timings as JSON."""
+    start = time.perf_counter()
+    from app.main import create_app
+    timings = [_elapsed_ms(start)]
+    start = time.perf_counter()
+    app = create_app()
+    timings.append(_elapsed_ms(start))
+    if mode == "cold":
+        timings.append(asyncio.run(_first_response_ms(app, "/health/live")))
+        timings.append(asyncio.run(_first_response_ms(app, "/health")))
+        print(json.dumps(timings))
+        return
+
+    # What gunicorn's when_ready and post_fork hooks do around the fork
+    from app.database import engines
+    engines.route_engine.url
+    read, write = os.pipe()
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid:
+        os.close(write)
+        with os.fdopen(read) as pipe:
+            print(pipe.read())
+        os.waitpid(pid, 0)
+        return
+    os.close(read)
+    engine = engines.route_engine
+    getattr(engine, "sync_engine", engine).dispose(close=False)
+    asyncio.run(_first_response_ms(app, "/health/live"))
+    timings = [_elapsed_ms(start)]
+    asyncio.run(_first_response_ms(app, "/health"))
+    timings.append(_elapsed_ms(start))
+    with os.fdopen(write, "w") as pipe:
+        pipe.write(json.dumps(timings))
+    os._exit(0)
+
+def run_probe(mode: str) -> list:
+    """Measure one fresh interpreter; returns its timings in milliseconds."""
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, __file__, "--probe", mode], check=True, capture_output=True, text=True,
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    return timings[:len(PHASES[mode])] + [_elapsed_ms(start)]
+
+def importtime(top: int):
+    """Print the modules with the largest cumulative import time under `import app.main`."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], check=True, capture_output=True, text=True,
+    ).stderr
+    modules = []
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        modules.append((int(cumulative), name.rstrip()))
+    print(f"\n{'cumulative import (ms)':>22}  module")
+    for cumulative, name in sorted(modules, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>22.1f}  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--importtime", type=int, default=0, metavar="TOP", help="List the TOP slowest imports")
+    parser.add_argument("--probe", choices=PHASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.probe:
+        probe(args.probe)
+        return
+
+    print(f"median of {args.runs} runs, DB_ASYNC={os.environ.get('DB_ASYNC', 'default')}\n")
+    print(f"{'phase':<34} {'ms':>9}")
+    for mode, phases in PHASES.items():
+        runs = [run_probe(mode) for _ in range(args.runs)]
+        print(f"{mode} process")
+        for index, phase in enumerate(phases + ["whole process (wall clock)"]):
+            print(f"  {phase:<32} {statistics.median(run[index] for run in runs):>9.1f}")
+    if args.importtime:
+        importtime(args.importtime)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Vote write path under concurrent load: check-then-write vs. single statement vs. write-behind.
+
+The legacy path is the original handler (post lookup, vote lookup, then the
+insert or delete, counter update and commit). Each mode runs `--concurrency`
+workers for `--duration` seconds, voting up or down at random on a small set
+of hot posts, and reports throughput, latency percentiles and server commits
+per second (from pg_stat_database), plus the 500s caused by the legacy race.
+
+Usage:
+    python benchmarks/bench_vote.py [--concurrency 32] [--duration 10] [--posts 20] [--users 2000]
+"""
+from app import models, schemas
+from app.database import SQLALCHEMY_ASYNC_DATABASE_URL
+from app.votes import record_vote, VoteBuffer, VoteOp
+from sqlalchemy import text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+async def legacy_vote(db, op: VoteOp) -> int:
+    """
+    The original check-then-write vote handler, returning its status code.
+    Two concurrent upvotes can both pass the vote lookup; the loser then fails
+    on the primary key, which the endpoint answered with a 500.
+    """
+    post = await db.get(models.Post, op.post_id)
+    if not post:
+        return 404
+    found_vote = await db.get(models.Vote, {"user_id": op.user_id, "post_id": op.post_id})
+    if op.dir == schemas.VoteDir.UP:
+        if found_vote:
+            return 409
+        db.add(models.Vote(post_id=op.post_id, user_id=op.user_id))
+        delta = 1
+    else:
+        if not found_vote:
+            return 404
+        await db.delete(found_vote)
+        delta = -1
+    try:
+        await db.execute(
+            update(models.Post)
+            .where(models.Post.id == op.post_id)
+            .values(vote_count=models.Post.vote_count + delta)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return 500
+    return 200
+
+async def seed(sessions, posts: int, users: int):
+    """Create the benchmark users and hot posts, returning their ids."""
+    async with sessions() as db:
+        user_ids = (await db.execute(text(
+            "INSERT INTO users (email, password) "
+            "SELECT 'bench-vote-' || i || '@example.com', 'x' FROM generate_series(1, :users) AS i "
+            "ON CONFLICT (email) DO UPDATE SET email = EXCLUDED.email RETURNING id"
+        ), {"users": users})).scalars().all()
+        post_ids = (await db.execute(text(
+            "INSERT INTO posts (title, content, owner_id) "
+            "SELECT 'hot post ' || i, 'vote benchmark', :owner_id FROM generate_series(1, :posts) AS i RETURNING id"
+        ), {"posts": posts, "owner_id": user_ids[0]})).scalars().all()
+        await db.commit()
+    return list(user_ids), list(post_ids)
+
+async def cleanup(sessions, post_ids):
+    """Delete the benchmark posts together with their votes."""
+    async with sessions() as db:
+        await db.execute(text("DELETE FROM posts WHERE id = ANY(:ids)"), {"ids": post_ids})
+        await db.commit()
+
+async def commits(sessions) -> int:
+    """Return the number of transactions committed in the current database so far."""
+    async with sessions() as db:
+        return (await db.execute(text(
+            "SELECT xact_commit FROM pg_stat_database WHERE datname = current_database()"
+        ))).scalar_one()
+
+async def run_mode(sessions, mode: str, user_ids, post_ids, concurrency: int, duration: float) -> dict:
+    """Drive one vote path with concurrent workers and collect latencies."""
+    buffer = VoteBuffer(window=0.002, max_size=concurrency)
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        async with sessions() as db:
+            while time.perf_counter() < deadline:
+                op = VoteOp(random.choice(user_ids), random.choice(post_ids), random.choice(list(schemas.VoteDir)))
+                start = time.perf_counter()
+                if mode == "legacy":
+                    status_code = await legacy_vote(db, op)
+                elif mode == "single statement":
+                    status_code, _ = await record_vote(db, op)
+                else:
+                    status_code, _ = await buffer.submit(db, op)
+                errors += status_code == 500
+                latencies.append(time.perf_counter() - start)
+                # Leave no snapshot or identity map state between votes
+                await db.rollback()
+                db.expunge_all()
+
+    # Backends flush their commit counters with a short delay
+    await asyncio.sleep(0.5)
+    commits_before = await commits(sessions)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.5)
+    commits_after = await commits(sessions)
+    latencies.sort()
+    return {
+        "votes_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "commits_per_second": (commits_after - commits_before) / elapsed,
+        "errors": errors,
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--posts", type=int, default=20)
+    parser.add_argument("--users", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, pool_size=args.concurrency + 1)
+    sessions = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    user_ids, post_ids = await seed(sessions, args.posts, args.users)
+    try:
+        print(f"{args.concurrency} workers, {args.duration:.0f}s per mode, {args.posts} hot posts\n")
+        print(f"{'mode':<18} {'votes/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'commits/s':>10} {'errors':>7}")
+        for mode in ("legacy", "single statement", "write-behind"):
+            result = await run_mode(sessions, mode, user_ids, post_ids, args.concurrency, args.duration)
+            print(
+                f"{mode:<18} {result['votes_per_second']:>9.0f} {result['p50_ms']:>9.2f}"
+                f" {result['p99_ms']:>9.2f} {result['commits_per_second']:>10.0f} {result['errors']:>7}"
+            )
+    finally:
+        await cleanup(sessions, post_ids)
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+"""
+Query plan check of every statement the routers issue, against the seeded dataset.
+
+Drives each endpoint once through the app in process, as a dedicated user,
+and records every SQL statement with its parameters. Each distinct statement
+is then replayed under `EXPLAIN (ANALYZE, BUFFERS)` in a transaction that is
+rolled back, and reported with its execution time and buffer usage. Exits
+with status 1 when any plan reads a table of at least `--min-rows` rows with
+a sequential scan.
+
+Routes run on the synchronous psycopg2 session whatever DB_ASYNC is set to,
+so the recorded statements can be replayed verbatim. Run
+`benchmarks/seed.py` first; the dedicated user is deleted afterwards.
+
+Usage:
+    python benchmarks/explain_queries.py [--min-rows 10000] [--plans]
+"""
+from app.config import settings
+from app.database import engine, get_async_db, SessionLocal, SyncSessionAdapter
+from app.main import app
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+import argparse
+import asyncio
+import httpx
+import json
+import sys
+
+EMAIL = "explain-queries@example.com"
+PASSWORD = "explain-queries"
+
+# Statements EXPLAIN accepts; transaction control and the like are not recorded
+EXPLAINABLE = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+class StatementRecorder:
+    """Records the first parameters of each distinct statement sent by the routes, with the request that sent it."""
+    def __init__(self):
+        self.request = None
+        self.statements = {}
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.request and statement.split(None, 1)[0].upper() in EXPLAINABLE:
+            self.statements.setdefault(statement, (self.request, parameters[0] if executemany else parameters))
+
+async def drive(client: httpx.AsyncClient, recorder: StatementRecorder, post_ids: list):
+    """Call every endpoint once, registering and logging in a fresh user first."""
+    async def call(method: str, path: str, **kwargs) -> httpx.Response:
+        recorder.request = f"{method} {path}"
+        response = await client.request(method, path, **kwargs)
+        recorder.request = None
+        if response.is_error:
+            sys.exit(f"{method} {path} answered {response.status_code}: {response.text}")
+        return response
+
+    user = (await call("POST", "/users/", json={"email": EMAIL, "password": PASSWORD})).json()
+    settings.export_user_ids = [user["id"]]
+    token = (await call("POST", "/login", data={"username": EMAIL, "password": PASSWORD})).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    await call("GET", f"/users/{user['id']}")
+    post = (await call("POST", "/posts/", json={"title": "explain title", "content": "explain content"})).json()
+    await call("POST", "/posts/bulk", json=[{"title": "explain bulk", "content": "explain content"}] * 10)
+    await call("PUT", f"/posts/{post['id']}", json={"title": "explained title", "content": "explain content"})
+    await call("GET", f"/posts/{post_ids[0]}")
+    await call("GET", "/posts/", params={"limit": 10, "skip": 1000})
+    await call("GET", "/posts/", params={"limit": 10, "search": "load post"})
+    page = (await call("GET", "/posts/feed", params={"limit": 20})).json()
+    await call("GET", "/posts/feed", params={"limit": 20, "cursor": page["next_cursor"]})
+    await call("GET", "/posts/feed", params={"limit": 20, "sort": "top"})
+    await call("GET", "/posts/hot", params={"limit": 20})
+    for window in ("1h", "24h", "7d", "30d", "all"):
+        await call("GET", "/posts/top", params={"limit": 20, "window": window})
+    await call("GET", "/posts/batch", params={"ids": post_ids})
+    await call("POST", "/vote/", json={"post_id": post_ids[0], "dir": 1})
+    await call("POST", "/vote/", json={"post_id": post_ids[0], "dir": 0})
+    await call("POST", "/vote/batch", json={"votes": [{"post_id": id, "dir": 1} for id in post_ids]})
+    since = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    await call("GET", "/export/posts", params={"since": since})
+    await call("GET", "/export/votes", params={"since": since, "format": "csv"})
+    await call("DELETE", f"/posts/{post['id']}")
+    await call("GET", "/health")
+
+def explain(statement: str, parameters) -> dict:
+    """
+    Run a statement under EXPLAIN (ANALYZE, BUFFERS) without keeping its effects.
+    Writes that can no longer succeed on replay (e.g. the unique user insert)
+    are only planned, so their plan has no execution time or buffer counts.
+    Returns:
+        dict: The JSON plan.
+    """
+    with engine.connect() as conn:
+        try:
+            return conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters).scalar_one()[0]
+        except DBAPIError:
+            conn.rollback()
+            return conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar_one()[0]
+        finally:
+            conn.rollback()
+
+def seq_scans(node: dict):
+    """Yield the relation of every sequential scan in a plan tree."""
+    if node["Node Type"] == "Seq Scan":
+        yield node["Relation Name"]
+    for child in node.get("Plans", []):
+        yield from seq_scans(child)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-rows", type=int, default=10000, help="Tables with at least this many rows must not be scanned sequentially")
+    parser.add_argument("--plans", action="store_true", help="Print the JSON plan of every statement")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        large_tables = set(db.execute(text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' "
+            "AND relnamespace = 'public'::regnamespace AND reltuples >= :min_rows"
+        ), {"min_rows": args.min_rows}).scalars())
+        post_ids = db.execute(text(
+            "SELECT p.id FROM posts AS p JOIN users AS u ON u.id = p.owner_id "
+            "WHERE u.email LIKE 'load-%@example.com' ORDER BY p.id LIMIT 20"
+        )).scalars().all()
+        db.execute(text("DELETE FROM users WHERE email = :email"), {"email": EMAIL})
+        db.commit()
+    if not post_ids:
+        sys.exit("No load-test data found, run benchmarks/seed.py first")
+
+    async def override_get_async_db():
+        db = SyncSessionAdapter(SessionLocal(expire_on_commit=False))
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://explain") as client:
+            await drive(client, recorder, post_ids)
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    recorder = StatementRecorder()
+    try:
+        asyncio.run(run())
+        failures = 0
+        print(f"{len(recorder.statements)} statements; large tables: {', '.join(sorted(large_tables)) or 'none'}\n")
+        print(f"{'request':<28} {'ms':>9} {'hit':>8} {'read':>8}  seq scans")
+        for statement, (request, parameters) in recorder.statements.items():
+            plan = explain(statement, parameters)
+            root = plan["Plan"]
+            scanned = sorted(set(seq_scans(root)) & large_tables)
+            failures += bool(scanned)
+            print(
+                f"{request[:28]:<28} {plan.get('Execution Time', float('nan')):>9.2f} {root.get('Shared Hit Blocks', '-'):>8}"
+                f" {root.get('Shared Read Blocks', '-'):>8}  {', '.join(scanned) or '-'}"
+            )
+            if scanned or args.plans:
+                print(f"  {' '.join(statement.split())}")
+                if args.plans:
+                    print(json.dumps(plan, indent=2))
+    finally:
+        app.dependency_overrides.clear()
+        with SessionLocal() as db:
+            db.execute(text("DELETE FROM users WHERE email = :email"), {"email": EMAIL})
+            db.commit()
+    if failures:
+        sys.exit(f"\n{failures} statements scan large tables sequentially")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Load test for the Chirp endpoints, with results saved as JSON.
+
+Drives `/login`, `/posts`, `/posts/{id}`, `/posts/batch`, `/vote` and `/health` one endpoint
+at a time with `--concurrency` concurrent clients, against the users and posts
+created by `benchmarks/seed.py`. By default requests go to the app in-process
+over ASGI, which also lets the harness count the database queries each
+endpoint issues; pass `--url` to target a running server instead (query
+counts are then omitted). Access tokens are minted with the configured
+SECRET_KEY, so the server must share this `.env`. Every client shares one IP,
+so run with RATE_LIMIT_BACKEND=none to keep `/login` under its rate limit.
+
+Each run writes throughput, p50/p95/p99 latency, status codes and queries per
+request for every endpoint to `--output`. Pass `--baseline` with an earlier
+result file to print the change per endpoint and exit with status 1 when a p99
+latency regressed by more than `--max-regression` percent.
+
+Usage:
+    python benchmarks/loadtest.py [--concurrency 32] [--requests 2000] [--endpoints login,posts,post,batch,vote,health]
+                                  [--url http://localhost:8000] [--output results.json] [--baseline results.json]
+"""
+from app.config import settings
+from app.database import async_engine, engine, SessionLocal
+from app.oauth2 import create_access_token
+from datetime import datetime, timezone
+from sqlalchemy import event, text
+import argparse
+import asyncio
+import httpx
+import json
+import pathlib
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ENDPOINTS = ("login", "posts", "post", "batch", "vote", "health")
+PASSWORD = "loadtest"
+
+class QueryCounter:
+    """Counts statements sent to the database by the in-process app engines."""
+    def __init__(self):
+        self.count = 0
+        for sync_engine in (engine, async_engine.sync_engine):
+            event.listen(sync_engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+def load_fixture() -> dict:
+    """
+    Read the ids of the seeded load-test users and posts.
+    Raises:
+        SystemExit: If `benchmarks/seed.py` has not been run.
+    Returns:
+        dict: User ids with their emails, and post ids.
+    """
+    with SessionLocal() as db:
+        users = db.execute(text(
+            "SELECT id, email FROM users WHERE email LIKE 'load-%@example.com' ORDER BY id LIMIT 10000"
+        )).all()
+        posts = db.execute(text(
+            "SELECT p.id FROM posts AS p JOIN users AS u ON u.id = p.owner_id "
+            "WHERE u.email LIKE 'load-%@example.com' ORDER BY p.id LIMIT 100000"
+        )).scalars().all()
+    if not users or not posts:
+        sys.exit("No load-test data found, run benchmarks/seed.py first")
+    return {"users": users, "posts": posts}
+
+def build_request(endpoint: str, fixture: dict, tokens: dict):
+    """Pick a random user and target for one request; returns (method, path, keyword arguments)."""
+    user_id, email = random.choice(fixture["users"])
+    headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+    if endpoint == "login":
+        return "POST", "/login", {"data": {"username": email, "password": PASSWORD}}
+    if endpoint == "posts":
+        return "GET", "/posts/", {"params": {"limit": 10, "skip": random.randrange(1000)}, "headers": headers}
+    if endpoint == "post":
+        return "GET", f"/posts/{random.choice(fixture['posts'])}", {"headers": headers}
+    if endpoint == "batch":
+        ids = random.sample(fixture["posts"], 20)
+        return "GET", "/posts/batch", {"params": {"ids": ids}, "headers": headers}
+    if endpoint == "vote":
+        payload = {"post_id": random.choice(fixture["posts"]), "dir": random.randint(0, 1)}
+        return "POST", "/vote/", {"json": payload, "headers": headers}
+    return "GET", "/health", {}
+
+def percentile(samples: list, share: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    return samples[max(0, min(len(samples) - 1, round(share * len(samples)) - 1))]
+
+async def run_endpoint(client, endpoint, fixture, tokens, requests, concurrency, queries) -> dict:
+    """
+    Send `requests` requests to one endpoint from `concurrency` concurrent clients.
+    Returns:
+        dict: Throughput, latency percentiles, status code counts and queries per request.
+    """
+    latencies, status_codes = [], {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            method, path, kwargs = build_request(endpoint, fixture, tokens)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                code = str(response.status_code)
+            except httpx.HTTPError as error:
+                code = type(error).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            status_codes[code] = status_codes.get(code, 0) + 1
+
+    queries_before = queries.count if queries else 0
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(latencies[-1], 2),
+        "status_codes": status_codes,
+        "queries_per_request": round((queries.count - queries_before) / requests, 2) if queries else None,
+    }
+
+def git_commit() -> str:
+    """Return the current commit hash, or "unknown" outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    """
+    Print per-endpoint changes against a baseline run.
+    Returns:
+        bool: True if no endpoint's p99 latency regressed by more than `max_regression` percent.
+    """
+    ok = True
+    print(f"\nAgainst baseline {baseline['meta']['commit']} ({baseline['meta']['timestamp']}):")
+    for key in ("target", "concurrency", "db_async", "users", "posts"):
+        if baseline["meta"].get(key) != results["meta"][key]:
+            print(f"warning: baseline ran with {key}={baseline['meta'].get(key)}, this run with {results['meta'][key]}")
+    for endpoint, current in results["endpoints"].items():
+        previous = baseline["endpoints"].get(endpoint)
+        if not previous:
+            continue
+        p99_change = (current["p99_ms"] - previous["p99_ms"]) / previous["p99_ms"] * 100
+        rps_change = (current["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"] * 100
+        regressed = p99_change > max_regression
+        ok = ok and not regressed
+        print(f"{endpoint:<8} p99 {p99_change:+7.1f}%  throughput {rps_change:+7.1f}%{'  REGRESSION' if regressed else ''}")
+    return ok
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--url", help="base URL of a running server; default drives the app in-process")
+    parser.add_argument("--output", type=pathlib.Path)
+    parser.add_argument("--baseline", type=pathlib.Path)
+    parser.add_argument("--max-regression", type=float, default=10.0, help="allowed p99 increase in percent")
+    args = parser.parse_args()
+    endpoints = [endpoint for endpoint in args.endpoints.split(",") if endpoint]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    fixture = load_fixture()
+    tokens = {user_id: create_access_token({"user_id": user_id}) for user_id, _ in fixture["users"]}
+    if args.url:
+        transport, base_url, queries = None, args.url, None
+    else:
+        from app.main import app
+        transport, base_url, queries = httpx.ASGITransport(app=app), "http://loadtest", QueryCounter()
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=60) as client:
+        results = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "target": args.url or "in-process",
+                "concurrency": args.concurrency,
+                "db_async": settings.db_async,
+                "users": len(fixture["users"]),
+                "posts": len(fixture["posts"]),
+            },
+            "endpoints": {},
+        }
+        print(f"{'endpoint':<8} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'queries':>8}  status codes")
+        for endpoint in endpoints:
+            result = await run_endpoint(client, endpoint, fixture, tokens, args.requests, args.concurrency, queries)
+            results["endpoints"][endpoint] = result
+            queries_per_request = "-" if result["queries_per_request"] is None else result["queries_per_request"]
+            print(
+                f"{endpoint:<8} {result['throughput_rps']:>8} {result['p50_ms']:>9} {result['p95_ms']:>9}"
+                f" {result['p99_ms']:>9} {queries_per_request:>8}  {result['status_codes']}"
+            )
+    output = args.output or pathlib.Path(__file__).parent / "results" / f"loadtest-{results['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nSaved {output}")
+    if args.baseline and not compare(results, json.loads(args.baseline.read_text()), args.max_regression):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+Seed the configured database with load-test users, posts and votes.
+
+Every seeded user has the email `load-<n>@example.com` and the password
+`loadtest`, so `benchmarks/loadtest.py` can log in as any of them. Posts are
+spread evenly over the users, and votes are distinct (user, post) pairs spread
+over all seeded posts; vote counters, hot scores and hourly vote buckets are
+recomputed afterwards. Rows are generated
+set-based inside Postgres, so the default volumes take minutes, not hours.
+
+Usage:
+    python benchmarks/seed.py [--users 100000] [--posts 1000000] [--votes 10000000] [--reset]
+"""
+from app.database import SessionLocal
+from app.ranking import HOT_SCORE_DECAY_SECONDS
+from app.utils import get_password_hash
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import argparse
+import time
+
+EMAIL_PATTERN = "load-%@example.com"
+PASSWORD = "loadtest"
+
+def reset(db: Session):
+    """Delete previously seeded users; their posts and votes go with them through ON DELETE CASCADE."""
+    db.execute(text("DELETE FROM users WHERE email LIKE :pattern"), {"pattern": EMAIL_PATTERN})
+    db.commit()
+
+def seed(db: Session, users: int, posts: int, votes: int):
+    """
+    Insert users, posts and votes, then refresh vote counters, rankings and planner statistics.
+    Args:
+        db (Session): SQLAlchemy session used for the inserts.
+        users (int): Number of users to create.
+        posts (int): Number of posts, owned round-robin by the new users.
+        votes (int): Number of votes, at most users * posts.
+    """
+    # One shared hash: hashing 100k passwords with Argon2 would dominate the seed time
+    password = get_password_hash(PASSWORD)
+    db.execute(text(
+        "INSERT INTO users (email, password) "
+        "SELECT 'load-' || i || '@example.com', :password FROM generate_series(1, :users) AS i"
+    ), {"users": users, "password": password})
+    # Number the new rows so posts and votes can reference them without fetching ids
+    db.execute(text(
+        "CREATE TEMP TABLE load_users ON COMMIT DROP AS "
+        "SELECT row_number() OVER (ORDER BY id) - 1 AS n, id FROM users WHERE email LIKE :pattern"
+    ), {"pattern": EMAIL_PATTERN})
+    db.execute(text(
+        "INSERT INTO posts (title, content, published, owner_id) "
+        "SELECT 'load post ' || i, 'content of load post ' || i, i % 10 <> 0, u.id "
+        "FROM generate_series(0, :posts - 1) AS i JOIN load_users AS u ON u.n = i % :users"
+    ), {"posts": posts, "users": users})
+    db.execute(text(
+        "CREATE TEMP TABLE load_posts ON COMMIT DROP AS "
+        "SELECT row_number() OVER (ORDER BY p.id) - 1 AS n, p.id "
+        "FROM posts AS p JOIN load_users AS u ON u.id = p.owner_id"
+    ))
+    # Vote i goes from user i % users to a post offset by i / users, so pairs never repeat
+    db.execute(text(
+        "INSERT INTO votes (user_id, post_id) "
+        "SELECT u.id, p.id FROM generate_series(0, :votes - 1) AS i "
+        "JOIN load_users AS u ON u.n = i % :users "
+        "JOIN load_posts AS p ON p.n = (i / :users + (i % :users) * 7919) % :posts"
+    ), {"votes": min(votes, users * posts), "users": users, "posts": posts})
+    # One aggregate pass; the per-post repair query would rescan votes for every post
+    db.execute(text(
+        "UPDATE posts SET vote_count = counts.votes, "
+        "hot_score = log(greatest(counts.votes, 1)) + extract(epoch FROM posts.created_at) / :decay "
+        "FROM (SELECT post_id, count(*) AS votes FROM votes GROUP BY post_id) AS counts "
+        "WHERE posts.id = counts.post_id AND posts.vote_count <> counts.votes"
+    ), {"decay": HOT_SCORE_DECAY_SECONDS})
+    db.execute(text(
+        "INSERT INTO post_vote_hours (post_id, hour, votes) "
+        "SELECT v.post_id, date_trunc('hour', v.created_at, 'UTC'), count(*) "
+        "FROM votes AS v JOIN load_posts AS p ON p.id = v.post_id GROUP BY 1, 2 "
+        "ON CONFLICT (post_id, hour) DO UPDATE SET votes = excluded.votes"
+    ))
+    db.commit()
+    for table in ("users", "posts", "votes", "post_vote_hours"):
+        db.execute(text(f"ANALYZE {table}"))
+    db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--votes", type=int, default=10_000_000)
+    parser.add_argument("--reset", action="store_true", help="delete previously seeded load-test data first")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.reset:
+            reset(db)
+        start = time.perf_counter()
+        seed(db, args.users, args.posts, args.votes)
+        print(
+            f"Seeded {args.users} users, {args.posts} posts and {min(args.votes, args.users * args.posts)} votes"
+            f" in {time.perf_counter() - start:.1f}s"
+        )
+
+if __name__ == "__main__":
+    main()
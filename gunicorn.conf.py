@@ -0,0 +1,58 @@
+"""
+Gunicorn settings for running Chirp with several uvicorn workers:
+    gunicorn app.main:app -c gunicorn.conf.py
+Set PROMETHEUS_MULTIPROC_DIR to a writable directory so /metrics aggregates all workers.
+
+The app is preloaded: the master imports it, reads the settings and creates the
+database engine (importing its driver) once, and every worker inherits them
+copy-on-write when it forks instead of repeating that work. No connection is
+opened before the fork, and each worker drops the pool state it inherited.
+"""
+from prometheus_client import multiprocess
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Proxies whose X-Forwarded-For is trusted for the client IP, which the IP-keyed login rate limit counts on
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1,::1")
+
+# The preloaded app creates its metric files while the config is being applied, before on_starting
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+def on_starting(server):
+    """Start from an empty metrics directory so files of a previous run (or of the master) are not summed in."""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
+
+def when_ready(server):
+    """Create the routes' database engine in the master, before the workers fork."""
+    from app.config import settings
+    from app.database import engines
+    server.log.info("Database engine ready: %r", engines.route_engine.url)
+    if server.cfg.workers > 1 and settings.response_cache_backend == "memory":
+        server.log.warning(
+            "RESPONSE_CACHE_BACKEND=memory caches per worker: writes reach the other workers only after "
+            "RESPONSE_CACHE_TTL_SECONDS (%ss); use redis to invalidate all of them at once",
+            settings.response_cache_ttl_seconds,
+        )
+    if settings.rate_limit_login and "FORWARDED_ALLOW_IPS" not in os.environ:
+        server.log.warning(
+            "RATE_LIMIT_LOGIN is keyed on the client IP but FORWARDED_ALLOW_IPS is not set: "
+            "behind a proxy, all clients share one login bucket"
+        )
+
+def post_fork(server, worker):
+    """Reset the inherited connection pool, so workers never share a connection with the master."""
+    from app.database import engines
+    engine = engines.route_engine
+    getattr(engine, "sync_engine", engine).dispose(close=False)
@@ -1,19 +1,36 @@
 from app import models
-from app.database import Base, get_db, SQLALCHEMY_DATABASE_URL
+from app.cache import response_cache
+from app.config import settings
+from app.database import (
+    Base,
+    get_async_db,
+    query_instrumentation,
+    SQLALCHEMY_ASYNC_DATABASE_URL,
+    SQLALCHEMY_DATABASE_URL,
+    SyncSessionAdapter,
+)
 from app.main import app
-from app.oauth2 import create_access_token
+from app.oauth2 import create_access_token, token_cache, user_cache
+from app.ratelimit import rate_limiter
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+import asyncio
 import pytest
 
-# Dedicated test database URL to avoid polluting production/dev data
+# Dedicated test database URLs to avoid polluting production/dev data
 TEST_SQLALCHEMY_DATABASE_URL = f"{SQLALCHEMY_DATABASE_URL}_test"
+TEST_SQLALCHEMY_ASYNC_DATABASE_URL = f"{SQLALCHEMY_ASYNC_DATABASE_URL}_test"
 
-# SQLAlchemy engine and session factory for isolated test DB
+# SQLAlchemy engines and session factories for isolated test DB
 engine = create_engine(TEST_SQLALCHEMY_DATABASE_URL)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# TestClient runs every request on a fresh event loop, so asyncpg connections cannot be pooled
+async_engine = create_async_engine(TEST_SQLALCHEMY_ASYNC_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 @pytest.fixture()
 def test_posts_data():
@@ -42,20 +59,41 @@ def session():
 @pytest.fixture()
 def client(session):
     """
-    Returns a TestClient with DB dependency overridden to use the test session.
-    Ensures API tests are run against the test database.
+    Returns a TestClient with DB dependency overridden to use the test database.
+    Follows `settings.db_async`, so the suite exercises the same driver as the app.
     """
-    def override_get_db():
-        try:
-            yield session
-        finally:
-            session.close()
+    async def override_get_async_db():
+        if settings.db_async:
+            async with TestingAsyncSessionLocal() as db:
+                yield db
+        else:
+            db = SyncSessionAdapter(TestingSessionLocal(expire_on_commit=False))
+            try:
+                yield db
+            finally:
+                await db.close()
 
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Ids are reused once tables are recreated, so cached users must not leak between tests
+    user_cache.clear()
+    token_cache.clear()
+    asyncio.run(response_cache.clear())
+    # Every test starts with full rate limit buckets
+    if settings.rate_limit_backend != "none":
+        asyncio.run(rate_limiter.clear())
     test_client = TestClient(app)
     yield test_client
     app.dependency_overrides.clear()
 
+@pytest.fixture
+def query_stats():
+    """Enables per-request query statistics on the test database engines."""
+    for test_engine in (engine, async_engine.sync_engine):
+        query_instrumentation.instrument(test_engine)
+    yield query_instrumentation
+    for test_engine in (engine, async_engine.sync_engine):
+        query_instrumentation.uninstrument(test_engine)
+
 @pytest.fixture
 def test_user_1(client):
     """Creates User 1 for authentication and authorization tests."""
@@ -1,8 +1,16 @@
-from app import schemas
-from app.config import settings
-from fastapi import status
+from app import models, schemas
+from app.config import configure, settings
+from app.oauth2 import token_cache, user_cache, verify_access_token
+from app.utils import BoundedExecutor, password_hash_executor
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, status
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+import asyncio
 import jwt
 import pytest
+import threading
+import time
 
 def test_login_user(test_user_1, client):
     """
@@ -46,4 +54,93 @@ def test_incorrect_login(test_user_1, client, email, password):
     response = client.post("/login", data={"username": email, "password": password})
     assert response.status_code == status.HTTP_403_FORBIDDEN
     body = response.json()
-    assert body.get("detail") == "Invalid Credentials"
\ No newline at end of file
+    assert body.get("detail") == "Invalid Credentials"
+
+def test_current_user_is_cached(authorized_client, test_post_ids):
+    """Repeated authenticated requests reuse the cached user instead of querying it."""
+    user_cache.clear()
+    for _ in range(3):
+        assert authorized_client.get(f"/posts/{test_post_ids[0]}").status_code == status.HTTP_200_OK
+    assert user_cache.stats()["misses"] == 1
+    assert user_cache.stats()["hits"] == 2
+
+def test_trust_token_skips_user_lookup(authorized_client, test_post_ids, monkeypatch):
+    """With auth_trust_token the principal comes from token claims alone."""
+    monkeypatch.setattr(settings, "auth_trust_token", True)
+    user_cache.clear()
+    assert authorized_client.get(f"/posts/{test_post_ids[0]}").status_code == status.HTTP_200_OK
+    assert user_cache.stats()["hits"] + user_cache.stats()["misses"] == 0
+
+def test_verified_token_is_cached(token):
+    """A repeated bearer token is served from the verified-token cache."""
+    credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    first = verify_access_token(token, credentials_exception)
+    second = verify_access_token(token, credentials_exception)
+    assert first == second
+    assert token_cache.stats()["hits"] == 1
+
+def test_cached_token_expires_with_token():
+    """Cached claims are never served after the token's own exp."""
+    expiring_token = jwt.encode(
+        {"user_id": 1, "exp": datetime.now(timezone.utc) + timedelta(seconds=1)},
+        settings.secret_key,
+        algorithm=settings.algorithm,
+    )
+    credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    assert verify_access_token(expiring_token, credentials_exception).id == "1"
+    time.sleep(1.1)
+    with pytest.raises(HTTPException):
+        verify_access_token(expiring_token, credentials_exception)
+
+def test_login_rehashes_outdated_password(session, client):
+    """Logging in upgrades a hash made with outdated Argon2 parameters."""
+    outdated_hash = PasswordHash((Argon2Hasher(time_cost=1, memory_cost=8192),)).hash("password_1")
+    session.add(models.User(email="legacy@gmail.com", password=outdated_hash))
+    session.commit()
+    response = client.post("/login", data={"username": "legacy@gmail.com", "password": "password_1"})
+    assert response.status_code == status.HTTP_200_OK
+    session.expire_all()
+    user = session.query(models.User).filter(models.User.email == "legacy@gmail.com").one()
+    assert user.password != outdated_hash
+    assert PasswordHash.recommended().verify("password_1", user.password)
+
+def test_login_rejected_when_hash_queue_full(test_user_1, client, monkeypatch):
+    """A saturated password-hash pool answers 503 instead of queueing more work."""
+    monkeypatch.setattr(password_hash_executor, "max_pending", 0)
+    response = client.post(
+        "/login",
+        data={"username": test_user_1['email'], "password": test_user_1['password']},
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+def test_hash_pool_counts_cancelled_calls_until_done():
+    """A call whose request was cancelled stays pending until its thread finishes."""
+    executor = BoundedExecutor(max_workers=1, max_pending=1, thread_name_prefix="test-hash")
+    release = threading.Event()
+
+    async def run():
+        task = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert executor.pending == 1
+        with pytest.raises(HTTPException):
+            await executor.run(time.sleep, 0)
+        release.set()
+        await asyncio.sleep(0.05)
+        return executor.pending
+
+    try:
+        assert asyncio.run(run()) == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+def test_configure_shuts_down_hash_pool():
+    """Applying new settings shuts the previous password-hash pool down."""
+    previous = password_hash_executor._executor
+    configure(settings.model_copy())
+    assert previous._shutdown
+    assert password_hash_executor._executor is not previous
@@ -0,0 +1,186 @@
+from app.cache import MemoryBackend, RedisBackend, ResponseCache, TTLCache
+import asyncio
+import pytest
+import time
+
+def test_ttl_cache_evicts_least_recently_used():
+    """The least recently used entry is evicted once the cache is full."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" becomes least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 3, "misses": 1, "hit_ratio": 0.75}
+
+def test_ttl_cache_expires_entries():
+    """Entries expire after the TTL or an earlier explicit deadline."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", 1, expires_at=time.monotonic() - 1)
+    cache.set("long", 2)
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    cache.invalidate("long")
+    assert cache.get("long") is None
+
+def test_ttl_cache_disabled_with_zero_size():
+    """A cache of size 0 never stores anything."""
+    cache = TTLCache(maxsize=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+def test_response_cache_single_flight():
+    """Concurrent misses for the same key share a single load."""
+    cache = ResponseCache(MemoryBackend(maxsize=10, ttl=60))
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"[]"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load(["posts"], "posts", load) for _ in range(5)))
+
+    assert asyncio.run(run()) == [b"[]"] * 5
+    assert len(calls) == 1
+
+def test_response_cache_failed_load_not_cached():
+    """A failing load propagates its error and leaves nothing cached."""
+    cache = ResponseCache(MemoryBackend(maxsize=10, ttl=60))
+
+    async def fail():
+        raise LookupError("missing")
+
+    async def load():
+        return b"{}"
+
+    async def run():
+        with pytest.raises(LookupError):
+            await cache.get_or_load(["post:1"], "post:1", fail)
+        return await cache.get_or_load(["post:1"], "post:1", load)
+
+    assert asyncio.run(run()) == b"{}"
+
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+def test_response_cache_versioned_invalidation(backend):
+    """Bumping a namespace hides every entry that depends on it."""
+    if backend == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        backend = RedisBackend(fakeredis.FakeAsyncRedis(), ttl=60)
+    else:
+        backend = MemoryBackend(maxsize=10, ttl=60)
+    cache = ResponseCache(backend)
+    bodies = iter([b"v1", b"v2", b"v3"])
+
+    async def load():
+        return next(bodies)
+
+    async def run():
+        first = await cache.get_or_load(["posts", "post:1"], "post:1", load)
+        cached = await cache.get_or_load(["posts", "post:1"], "post:1", load)
+        await cache.invalidate("post:2")
+        unrelated = await cache.get_or_load(["posts", "post:1"], "post:1", load)
+        await cache.invalidate("post:1")
+        reloaded = await cache.get_or_load(["posts", "post:1"], "post:1", load)
+        return first, cached, unrelated, reloaded
+
+    assert asyncio.run(run()) == (b"v1", b"v1", b"v1", b"v2")
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2
+
+def test_response_cache_leader_cancelled():
+    """When the request running a shared load is cancelled, the requests that joined it load again."""
+    cache = ResponseCache(MemoryBackend(maxsize=10, ttl=60))
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"[]"
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_load(["posts"], "posts", load))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(cache.get_or_load(["posts"], "posts", load)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(run()) == [b"[]"] * 3
+    # The cancelled load, then a single load shared again by the followers
+    assert len(calls) == 2
+
+def test_response_cache_follower_cancelled():
+    """Cancelling a request that joined a shared load leaves the load and the other requests unaffected."""
+    cache = ResponseCache(MemoryBackend(maxsize=10, ttl=60))
+
+    async def load():
+        await asyncio.sleep(0.05)
+        return b"[]"
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_load(["posts"], "posts", load))
+        await asyncio.sleep(0)
+        follower, other = (asyncio.create_task(cache.get_or_load(["posts"], "posts", load)) for _ in range(2))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await asyncio.gather(leader, other)
+
+    assert asyncio.run(run()) == [b"[]"] * 2
+    assert cache.stats()["misses"] == 3
+
+def test_memory_backend_versions_bounded():
+    """Namespace versions are evicted like entries, and an evicted namespace never reuses an old version."""
+    backend = MemoryBackend(maxsize=2, ttl=60)
+    cache = ResponseCache(backend)
+    bodies = iter([b"v1", b"v2"])
+
+    async def load():
+        return next(bodies)
+
+    async def run():
+        first = await cache.get_or_load(["post:1"], "post:1", load)
+        for post_id in range(2, 10):
+            await cache.invalidate(f"post:{post_id}")
+        reloaded = await cache.get_or_load(["post:1"], "post:1", load)
+        return first, reloaded
+
+    assert asyncio.run(run()) == (b"v1", b"v2")
+    assert backend._versions.stats()["size"] == 2
+
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+def test_response_cache_invalidation_across_workers(backend):
+    """
+    A write in one worker hides the other workers' redis entries at once, but their
+    memory entries stay visible (stale) until RESPONSE_CACHE_TTL_SECONDS runs out.
+    """
+    if backend == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        writer, reader = (ResponseCache(RedisBackend(fakeredis.FakeAsyncRedis(server=server), ttl=0.2)) for _ in range(2))
+    else:
+        writer, reader = (ResponseCache(MemoryBackend(maxsize=10, ttl=0.2)) for _ in range(2))
+
+    def loader(body):
+        async def load():
+            return body
+        return load
+
+    async def run():
+        await reader.get_or_load(["post:1"], "post:1", loader(b"v1"))
+        await writer.invalidate("post:1")
+        after_write = await reader.get_or_load(["post:1"], "post:1", loader(b"v2"))
+        await asyncio.sleep(0.25)
+        after_ttl = await reader.get_or_load(["post:1"], "post:1", loader(b"v3"))
+        return after_write, after_ttl
+
+    after_write, after_ttl = asyncio.run(run())
+    if backend == "redis":
+        assert after_write == b"v2"
+    else:
+        assert after_write == b"v1" and after_ttl == b"v3"
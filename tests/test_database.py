@@ -0,0 +1,72 @@
+from app.config import settings
+from app.database import _pool_options, get_db, ping_database
+from app.pool import pool_status, TimedNullPool, TimedQueuePool
+from fastapi import status
+from sqlalchemy import create_engine, exc, text
+import asyncio
+import json
+import pytest
+
+def test_pool_status_reports_saturation_and_timeouts(session):
+    """Checkouts, saturation and exhausted-pool timeouts are reported."""
+    engine = create_engine(
+        session.get_bind().url,
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    try:
+        with engine.connect():
+            status = pool_status(engine.pool, max_overflow=0)
+            assert status["checked_out"] == 1
+            assert status["saturation"] == 1.0
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        status = pool_status(engine.pool, max_overflow=0)
+        assert status["capacity"] == 1
+        assert status["overflow"] == 0
+        assert status["checked_out"] == 0
+        assert status["checkouts"] == 1
+        assert status["timeouts"] == 1
+        assert status["wait_seconds_max"] >= 0.05
+    finally:
+        engine.dispose()
+
+def test_pgbouncer_pool_options(monkeypatch):
+    """Behind a transaction pooler, connections are not pooled and asyncpg caches no prepared statements."""
+    monkeypatch.setattr(settings, "db_pool_mode", "pgbouncer")
+    options = _pool_options(async_driver=True)
+    assert options["poolclass"] is TimedNullPool
+    assert options["connect_args"]["statement_cache_size"] == 0
+    name_func = options["connect_args"]["prepared_statement_name_func"]
+    assert name_func() != name_func()
+    assert "connect_args" not in _pool_options(async_driver=False)
+
+def test_sync_driver_serves_routes(authorized_client, test_user_1, monkeypatch):
+    """With db_async disabled, routes run on the psycopg2 session through SyncSessionAdapter."""
+    monkeypatch.setattr(settings, "db_async", False)
+    monkeypatch.setattr(settings, "export_user_ids", [test_user_1["id"]])
+    res = authorized_client.post("/posts/", json={"title": "sync title", "content": "sync content"})
+    assert res.status_code == status.HTTP_201_CREATED
+    post_id = res.json()["id"]
+    res = authorized_client.put(f"/posts/{post_id}", json={"title": "sync title", "content": "updated"})
+    assert res.json()["content"] == "updated"
+    res = authorized_client.post("/vote/", json={"post_id": post_id, "dir": 1})
+    assert res.status_code == status.HTTP_200_OK
+    assert authorized_client.get(f"/posts/{post_id}").json()["votes"] == 1
+    assert [post["Post"]["id"] for post in authorized_client.get("/posts/").json()] == [post_id]
+    lines = authorized_client.get("/export/posts").text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [post_id]
+    res = authorized_client.delete(f"/posts/{post_id}")
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+    assert authorized_client.get(f"/posts/{post_id}").status_code == status.HTTP_404_NOT_FOUND
+
+def test_sync_driver_ping_and_session(monkeypatch):
+    """The health check and CLI session dependency use the psycopg2 engine."""
+    monkeypatch.setattr(settings, "db_async", False)
+    asyncio.run(ping_database())
+    sessions = get_db()
+    db = next(sessions)
+    assert db.execute(text("SELECT 1")).scalar() == 1
+    sessions.close()
@@ -0,0 +1,90 @@
+from app import models
+from app.config import settings
+from app.oauth2 import create_access_token
+from datetime import datetime, timedelta, timezone
+from fastapi import status
+import csv
+import io
+import json
+import pytest
+
+@pytest.fixture
+def exporter(monkeypatch, test_user_1):
+    """Allows User 1, the user of `authorized_client`, to download exports."""
+    monkeypatch.setattr(settings, "export_user_ids", [test_user_1["id"]])
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    """Fetch two rows per cursor batch so exports span several chunks."""
+    monkeypatch.setattr(settings, "export_batch_size", 2)
+
+@pytest.fixture
+def test_votes(session, test_post_ids, test_user_1, test_user_2):
+    """Seeds votes cast one day apart, oldest first; returns their (user_id, post_id, created_at)."""
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    votes = [
+        (test_user_1["id"], test_post_ids[0], start),
+        (test_user_2["id"], test_post_ids[0], start + timedelta(days=1)),
+        (test_user_1["id"], test_post_ids[3], start + timedelta(days=2)),
+    ]
+    session.add_all(models.Vote(user_id=user_id, post_id=post_id, created_at=created_at) for user_id, post_id, created_at in votes)
+    session.commit()
+    return votes
+
+def test_export_posts_ndjson(authorized_client, test_post_ids, small_batches, exporter):
+    """Posts export as one JSON object per line with their vote counts, oldest first."""
+    authorized_client.post("/vote/", json={"post_id": test_post_ids[1], "dir": 1})
+    response = authorized_client.get("/export/posts")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    posts = [json.loads(line) for line in response.text.splitlines()]
+    assert [post["id"] for post in posts] == test_post_ids
+    assert [post["vote_count"] for post in posts] == [0, 1, 0, 0]
+    assert set(posts[0]) == {"id", "title", "content", "published", "created_at", "owner_id", "vote_count"}
+    assert posts[0]["title"] == "1st title" and posts[0]["created_at"].endswith("Z")
+
+def test_export_posts_csv(authorized_client, test_post_ids, small_batches, exporter):
+    """The CSV export has a header row and one record per post."""
+    response = authorized_client.get("/export/posts", params={"format": "csv"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="posts.csv"'
+    posts = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(post["id"]) for post in posts] == test_post_ids
+    assert [post["published"] for post in posts] == ["False", "True", "False", "True"]
+
+@pytest.mark.parametrize("format", ["ndjson", "csv"])
+def test_export_votes_since(authorized_client, test_votes, small_batches, exporter, format):
+    """Vote exports are ordered by creation time and `since` keeps votes cast at or after it."""
+    since = test_votes[1][2].isoformat()
+    response = authorized_client.get("/export/votes", params={"format": format, "since": since})
+    assert response.status_code == status.HTTP_200_OK
+    if format == "csv":
+        votes = list(csv.DictReader(io.StringIO(response.text)))
+    else:
+        votes = [json.loads(line) for line in response.text.splitlines()]
+    expected = [
+        {"user_id": user_id, "post_id": post_id, "created_at": created_at.isoformat().replace("+00:00", "Z")}
+        for user_id, post_id, created_at in test_votes[1:]
+    ]
+    if format == "csv":
+        expected = [{key: str(value) for key, value in vote.items()} for vote in expected]
+    assert votes == expected
+
+def test_export_empty(authorized_client, small_batches, exporter):
+    """An empty table exports nothing as NDJSON and only the header as CSV."""
+    assert authorized_client.get("/export/votes").text == ""
+    assert authorized_client.get("/export/votes", params={"format": "csv"}).text.splitlines() == ["user_id,post_id,created_at"]
+
+@pytest.mark.parametrize("dataset", ["posts", "votes"])
+def test_unauthorized_user_export(client, dataset):
+    """Unauthorized user cannot export."""
+    response = client.get(f"/export/{dataset}")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.parametrize("dataset", ["posts", "votes"])
+def test_export_forbidden_for_other_users(client, test_user_2, exporter, dataset):
+    """Users outside EXPORT_USER_IDS cannot download other users' posts and votes."""
+    client.headers = {**client.headers, "Authorization": f"Bearer {create_access_token({'user_id': test_user_2['id']})}"}
+    response = client.get(f"/export/{dataset}")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
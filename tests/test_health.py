@@ -1,5 +1,8 @@
-from app import schemas
+from app import main, schemas
+from app.database import engines, ping_database
+from app.health import HealthMonitor
 from fastapi import status
+import asyncio
 
 def test_health_check(client):
     """
@@ -16,4 +19,95 @@ def test_health_check(client):
     # Validate application version
     assert health_status.version == "1.0.0"
     # Validate database connectivity status
-    assert health_status.database == schemas.DatabaseStatus.connected
\ No newline at end of file
+    assert health_status.database == schemas.DatabaseStatus.connected
+    # Validate connection pool report
+    assert health_status.pool.mode == "queue"
+    assert health_status.pool.checked_out >= 0
+    assert 0 <= health_status.pool.overflow <= health_status.pool.capacity - health_status.pool.size
+
+def test_metrics(authorized_client, test_post_ids):
+    """
+    Verify the /metrics endpoint:
+    - Serves the Prometheus text format
+    - Labels requests by route template and status code
+    - Reports pool, cache and password-hash queue gauges
+    """
+    authorized_client.get(f"/posts/{test_post_ids[0]}")
+    authorized_client.get("/posts/8000000")
+    response = authorized_client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'chirp_http_requests_total{method="GET",route="/posts/{id}",status="200"}' in body
+    assert 'chirp_http_requests_total{method="GET",route="/posts/{id}",status="404"}' in body
+    assert 'chirp_http_request_duration_seconds_bucket{le="0.005",method="GET",route="/posts/{id}"}' in body
+    assert 'chirp_http_requests_in_progress{method="GET"} 1.0' in body
+    assert 'chirp_cache_hits{cache="users"}' in body
+    for gauge in ("chirp_db_pool_checked_out", "chirp_db_pool_capacity", "chirp_password_hash_queue_depth"):
+        assert f"\n{gauge} " in body
+
+def test_liveness(client):
+    """The liveness probe answers without a database session."""
+    response = client.get("/health/live")
+    assert response.status_code == status.HTTP_200_OK
+    liveness = schemas.LivenessStatus(**response.json())
+    assert liveness.status == "ok"
+    assert liveness.version == "1.0.0"
+
+def test_readiness_follows_background_checks(client, monkeypatch):
+    """
+    Verify the /health/ready endpoint:
+    - Is unready until the first successful check
+    - Stays ready below the failure threshold, then turns unready
+    """
+    monitor = HealthMonitor(check=None, interval=60, timeout=1, failure_threshold=2)
+    monkeypatch.setattr(main, "health_monitor", monitor)
+    assert client.get("/health/ready").status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    async def succeed():
+        pass
+
+    async def fail():
+        raise ConnectionError("connection refused")
+
+    monitor.check = succeed
+    asyncio.run(monitor.check_once())
+    response = client.get("/health/ready")
+    assert response.status_code == status.HTTP_200_OK
+    readiness = schemas.ReadinessStatus(**response.json())
+    assert readiness.database == schemas.DatabaseStatus.connected
+    assert readiness.last_check_latency_ms >= 0
+    assert readiness.pool.mode == "queue"
+    assert readiness.pool.overflow >= 0
+
+    monitor.check = fail
+    asyncio.run(monitor.check_once())
+    response = client.get("/health/ready")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["database"] == "unreachable"
+    asyncio.run(monitor.check_once())
+    response = client.get("/health/ready")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    readiness = schemas.ReadinessStatus(**response.json())
+    assert readiness.status == "unready"
+    assert readiness.consecutive_failures == 2
+    assert readiness.last_error == "ConnectionError: connection refused"
+
+def test_monitor_checks_database_in_background():
+    """Once started, the monitor pings the database every interval until it is stopped."""
+    async def run():
+        monitor = HealthMonitor(check=ping_database, interval=0.01, timeout=5, failure_threshold=1)
+        monitor.start()
+        try:
+            while not monitor.ready:
+                await asyncio.sleep(0.01)
+            first_check = monitor.last_checked_at
+            while monitor.last_checked_at == first_check:
+                await asyncio.sleep(0.01)
+        finally:
+            await monitor.stop()
+            await engines.dispose()
+        assert monitor.consecutive_failures == 0
+        assert monitor._task is None
+
+    asyncio.run(asyncio.wait_for(run(), 10))
@@ -0,0 +1,49 @@
+from app.config import configure, Lazy, settings
+from app.main import create_app
+from fastapi import status
+from fastapi.testclient import TestClient
+import os
+import subprocess
+import sys
+import threading
+
+def test_import_reads_no_settings(tmp_path):
+    """The app imports without any environment or .env; settings are read, and engines created, on first use."""
+    script = (
+        "import app.main, sys\n"
+        "assert 'psycopg2' not in sys.modules and 'asyncpg' not in sys.modules\n"
+        "from app.config import settings\n"
+        "from pydantic import ValidationError\n"
+        "try:\n"
+        "    settings.db_host\n"
+        "except ValidationError:\n"
+        "    sys.exit(0)\n"
+        "sys.exit('settings were read without DB_HOST')\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONPATH": root}
+    result = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+def test_create_app_with_settings(client):
+    """Apps built with explicit settings use them, e.g. for their rate limits."""
+    original = settings.model_copy()
+    try:
+        app = create_app(settings.model_copy(update={"rate_limit_backend": "memory", "rate_limit_search": "1/minute"}))
+        limited = TestClient(app)
+        assert limited.get("/posts/", params={"search": "a"}).status_code == status.HTTP_401_UNAUTHORIZED
+        assert limited.get("/posts/", params={"search": "a"}).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert limited.get("/health/live").json()["version"] == app.version
+    finally:
+        configure(original)
+    assert settings.rate_limit_search == original.rate_limit_search
+
+def test_lazy_factory_resolves_other_lazies():
+    """A factory may use proxies that are not built yet, as most do with `settings`."""
+    base = Lazy(lambda: {"size": 2})
+    dependent = Lazy(lambda: {"sizes": [base.get("size")] * 2})
+    resolved = []
+    thread = threading.Thread(target=lambda: resolved.append(dependent.get("sizes")), daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert resolved == [[2, 2]]
@@ -0,0 +1,55 @@
+from app import maintenance, models
+from app.maintenance import prune_vote_hours, repair_vote_counts
+from app.ranking import VOTE_HOURS_RETENTION
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import sessionmaker
+import sys
+
+def _run_main(monkeypatch, session, command: str):
+    """Run the maintenance command line against the test database."""
+    monkeypatch.setattr(maintenance, "SessionLocal", sessionmaker(bind=session.get_bind()))
+    monkeypatch.setattr(sys, "argv", ["app.maintenance", command])
+    maintenance.main()
+
+def test_repair_vote_counts(session, test_user_1, test_post_ids):
+    """Drifted vote counters are recomputed from the votes table."""
+    session.add(models.Vote(user_id=test_user_1["id"], post_id=test_post_ids[0]))
+    session.query(models.Post).filter(models.Post.id == test_post_ids[1]).update({"vote_count": 5})
+    session.commit()
+    assert repair_vote_counts(session) == 2
+    counts = dict(session.query(models.Post.id, models.Post.vote_count).all())
+    assert counts == {test_post_ids[0]: 1, test_post_ids[1]: 0, test_post_ids[2]: 0, test_post_ids[3]: 0}
+    # A consistent table needs no further corrections
+    assert repair_vote_counts(session) == 0
+
+def test_repair_vote_counts_command(session, test_post_ids, monkeypatch, capsys):
+    """`python -m app.maintenance repair-vote-counts` reports the number of corrected posts."""
+    session.query(models.Post).filter(models.Post.id.in_(test_post_ids[:3])).update({"vote_count": 7})
+    session.commit()
+    _run_main(monkeypatch, session, "repair-vote-counts")
+    assert capsys.readouterr().out == "Corrected vote_count on 3 post(s)\n"
+    session.expire_all()
+    assert session.query(models.Post.vote_count).filter(models.Post.vote_count != 0).count() == 0
+
+def test_prune_vote_hours(session, test_post_ids):
+    """Buckets older than the longest top window are deleted, recent ones kept."""
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    session.add_all([
+        models.PostVoteHour(post_id=test_post_ids[0], hour=now, votes=1),
+        models.PostVoteHour(post_id=test_post_ids[0], hour=now - VOTE_HOURS_RETENTION - timedelta(hours=1), votes=1),
+    ])
+    session.commit()
+    assert prune_vote_hours(session) == 1
+    assert session.query(models.PostVoteHour.hour).scalar() == now
+
+def test_prune_vote_hours_command(session, test_post_ids, monkeypatch, capsys):
+    """`python -m app.maintenance prune-vote-hours` reports the number of deleted buckets."""
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    session.add_all([
+        models.PostVoteHour(post_id=post_id, hour=now - VOTE_HOURS_RETENTION - timedelta(hours=1), votes=1)
+        for post_id in test_post_ids[:2]
+    ])
+    session.commit()
+    _run_main(monkeypatch, session, "prune-vote-hours")
+    assert capsys.readouterr().out == "Deleted 2 expired vote bucket(s)\n"
+    assert session.query(models.PostVoteHour).count() == 0
@@ -1,6 +1,16 @@
-from app import schemas
+from app import models, schemas
+from app.cache import response_cache
+from app.config import settings
+from app.database import SyncSessionAdapter
+from app.oauth2 import create_access_token
+from app.ranking import hot_score, HOT_SCORE_DECAY_SECONDS
+from app.votes import record_votes, VoteOp
+from datetime import timedelta
 from fastapi import status
+from sqlalchemy import update
+import asyncio
 import pytest
+import re
 
 # GET /posts
 def test_get_all_posts(authorized_client, test_post_ids):
@@ -10,6 +20,157 @@ def test_get_all_posts(authorized_client, test_post_ids):
     posts = [schemas.PostOut(**post) for post in response.json()]
     assert len(posts) == len(test_post_ids)
 
+def test_get_all_posts_newest_first(authorized_client, test_post_ids):
+    """Listings are ordered newest first, so skip pages neither repeat nor miss posts."""
+    pages = [authorized_client.get("/posts/", params={"limit": 2, "skip": skip}).json() for skip in (0, 2)]
+    assert [post["Post"]["id"] for page in pages for post in page] == sorted(test_post_ids, reverse=True)
+
+@pytest.mark.parametrize(
+    "search, expected",
+    [
+        ("2nd", [1]),  # full-text match on the title
+        ("contents", [3, 2, 1, 0]),  # stemmed full-text match on the content
+        ('"3rd content"', [2]),  # web search phrase syntax
+        ("titlr", [3, 2, 1, 0]),  # trigram fallback tolerates typos
+        ("2nd title", [1, 3, 2, 0]),  # full-text match above similarity-only matches
+    ],
+)
+def test_search_posts(authorized_client, test_post_ids, search, expected):
+    """Search covers title and content, ranks matches (ties newest first) and tolerates typos."""
+    response = authorized_client.get("/posts/", params={"search": search})
+    assert response.status_code == status.HTTP_200_OK
+    found = [schemas.PostOut(**post).Post.id for post in response.json()]
+    assert found == [test_post_ids[index] for index in expected]
+
+def test_search_ranks_title_matches_first(authorized_client, test_post_ids):
+    """Posts matching in the title rank above posts matching only in the content."""
+    payload = {"title": "unrelated", "content": "a note about pizza"}
+    authorized_client.post("/posts/", json=payload)
+    payload = {"title": "pizza night", "content": "details"}
+    title_match = authorized_client.post("/posts/", json=payload).json()["id"]
+    response = authorized_client.get("/posts/", params={"search": "pizza"})
+    posts = [schemas.PostOut(**post) for post in response.json()]
+    assert len(posts) == 2
+    assert posts[0].Post.id == title_match
+
+# GET /posts/feed
+def test_get_feed_pages_through_all_posts(authorized_client, test_post_ids):
+    """Following next_cursor visits every post exactly once, newest first."""
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = authorized_client.get("/posts/feed", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = schemas.PostPage(**response.json())
+        seen.extend(post.Post.id for post in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == sorted(test_post_ids, reverse=True)
+
+def test_get_feed_top_orders_by_votes(authorized_client, test_post_ids):
+    """The top feed orders by vote count, breaking ties by id."""
+    payload = {"post_id": test_post_ids[1], "dir": schemas.VoteDir.UP}
+    assert authorized_client.post("/vote/", json=payload).status_code == status.HTTP_200_OK
+    response = authorized_client.get("/posts/feed", params={"sort": "top", "limit": 2})
+    page = schemas.PostPage(**response.json())
+    assert [post.Post.id for post in page.items] == [test_post_ids[1], test_post_ids[3]]
+    response = authorized_client.get("/posts/feed", params={"sort": "top", "cursor": page.next_cursor})
+    page = schemas.PostPage(**response.json())
+    assert [post.Post.id for post in page.items] == [test_post_ids[2], test_post_ids[0]]
+    assert page.next_cursor is None
+
+@pytest.mark.parametrize("sort, cursor", [("new", "not-a-cursor"), ("top", None)])
+def test_get_feed_invalid_cursor(authorized_client, test_post_ids, sort, cursor):
+    """Malformed cursors and cursors from another sort order are rejected."""
+    if cursor is None:
+        response = authorized_client.get("/posts/feed", params={"limit": 1})
+        cursor = response.json()["next_cursor"]
+    response = authorized_client.get("/posts/feed", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+# GET /posts/hot and /posts/top
+def _vote(session, user_ids, post_id):
+    """Upvote a post as each of the given users through the vote write path."""
+    ops = [VoteOp(user_id, post_id, schemas.VoteDir.UP) for user_id in user_ids]
+    asyncio.run(record_votes(SyncSessionAdapter(session), ops))
+
+def test_get_hot_posts(authorized_client, session, test_user_1, test_user_2, test_post_ids):
+    """Hot ranking puts voted posts first and pages through every post once."""
+    _vote(session, [test_user_1["id"], test_user_2["id"]], test_post_ids[2])
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = authorized_client.get("/posts/hot", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = schemas.PostPage(**response.json())
+        seen.extend(post.Post.id for post in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    # Posts created together only differ by votes, and ties break by id
+    assert seen == [test_post_ids[2], test_post_ids[3], test_post_ids[1], test_post_ids[0]]
+
+def test_hot_score_decays_with_age(authorized_client, session, test_user_1, test_user_2, test_post_ids):
+    """A post needs ten times the votes per decay period of age to keep its rank."""
+    _vote(session, [test_user_1["id"], test_user_2["id"]], test_post_ids[0])
+    # Age the voted post by two decay periods, as if it had been created that much earlier
+    created_at = models.Post.created_at - timedelta(seconds=HOT_SCORE_DECAY_SECONDS * 2)
+    session.execute(
+        update(models.Post)
+        .where(models.Post.id == test_post_ids[0])
+        .values(created_at=created_at, hot_score=hot_score(models.Post.vote_count, created_at))
+    )
+    session.commit()
+    response = authorized_client.get("/posts/hot", params={"limit": 4})
+    ids = [post["Post"]["id"] for post in response.json()["items"]]
+    assert ids == [test_post_ids[3], test_post_ids[2], test_post_ids[1], test_post_ids[0]]
+
+def test_get_top_posts_by_window(authorized_client, session, test_user_1, test_user_2, test_post_ids):
+    """Top rankings only count votes cast within the window."""
+    _vote(session, [test_user_1["id"], test_user_2["id"]], test_post_ids[1])
+    _vote(session, [test_user_1["id"]], test_post_ids[2])
+    # Move the votes on post 1 two days back
+    session.execute(
+        update(models.PostVoteHour)
+        .where(models.PostVoteHour.post_id == test_post_ids[1])
+        .values(hour=models.PostVoteHour.hour - timedelta(days=2))
+    )
+    session.commit()
+
+    def top(**params):
+        response = authorized_client.get("/posts/top", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        return [post["Post"]["id"] for post in response.json()["items"]]
+
+    assert top() == [test_post_ids[2]]
+    assert top(window="7d") == [test_post_ids[1], test_post_ids[2]]
+    assert top(window="all") == [test_post_ids[1], test_post_ids[2], test_post_ids[3], test_post_ids[0]]
+    page = authorized_client.get("/posts/top", params={"window": "7d", "limit": 1}).json()
+    assert [post["Post"]["id"] for post in page["items"]] == [test_post_ids[1]]
+    assert top(window="7d", cursor=page["next_cursor"]) == [test_post_ids[2]]
+    # Cursors are bound to their window
+    response = authorized_client.get("/posts/top", params={"window": "30d", "cursor": page["next_cursor"]})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_post_listing_query_count_independent_of_page_size(authorized_client, session, query_stats):
+    """Listing pages load owners in the page query itself, whatever the page size and number of owners."""
+    owners = [models.User(email=f"owner_{i}@gmail.com", password="hashed") for i in range(20)]
+    session.add_all(owners)
+    session.flush()
+    session.add_all(models.Post(title=f"title {i}", content="content", owner_id=owners[i % 20].id) for i in range(40))
+    session.commit()
+
+    def page_queries(path, limit):
+        response = authorized_client.get(path, params={"limit": limit})
+        assert response.status_code == status.HTTP_200_OK
+        return int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+    # Warm the user cache so the requests below only run their page query
+    authorized_client.get("/posts/", params={"limit": 0})
+    for path in ("/posts/", "/posts/feed"):
+        assert [page_queries(path, limit) for limit in (1, 10, 40)] == [1, 1, 1]
+
 def test_unauthorized_user_get_all_posts(client):
     """Unauthorized user cannot retrieve posts."""
     response = client.get("/posts/")
@@ -25,6 +186,13 @@ def test_get_one_post_not_exist(authorized_client):
     response = authorized_client.get("/posts/88888")
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
+@pytest.mark.parametrize("method", ["GET", "PUT", "DELETE"])
+def test_post_id_out_of_range(authorized_client, method):
+    """Ids beyond the integer column range are rejected before reaching the database."""
+    json = {"title": "title", "content": "content"} if method == "PUT" else None
+    response = authorized_client.request(method, f"/posts/{2**40}", json=json)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
 def test_get_one_post(authorized_client, test_user_1, test_post_ids, test_posts_data):
     """Authorized user retrieves a specific post."""
     response = authorized_client.get(f"/posts/{test_post_ids[0]}")
@@ -36,6 +204,79 @@ def test_get_one_post(authorized_client, test_user_1, test_post_ids, test_posts_
     assert post.Post.published == test_posts_data[0]["published"]
     assert post.Post.owner_id == test_user_1['id']
 
+def test_voted_by_me(authorized_client, session, test_user_1, test_user_2, test_post_ids):
+    """Every post read reports whether the requesting user voted, from cached responses shared by all users."""
+    _vote(session, [test_user_1["id"]], test_post_ids[1])
+    _vote(session, [test_user_2["id"]], test_post_ids[2])
+
+    def voted(path, items=lambda body: body):
+        posts = items(authorized_client.get(path).json())
+        return {post["Post"]["id"]: post["voted_by_me"] for post in posts}
+
+    expected = {test_post_ids[0]: False, test_post_ids[1]: True, test_post_ids[2]: False, test_post_ids[3]: False}
+    assert voted("/posts/") == expected
+    assert voted("/posts/feed", lambda page: page["items"]) == expected
+    assert voted("/posts/hot", lambda page: page["items"]) == expected
+    assert voted(f"/posts/{test_post_ids[1]}", lambda post: [post]) == {test_post_ids[1]: True}
+    # User 2 is served the responses cached for user 1, with its own flags
+    token = create_access_token({"user_id": test_user_2["id"]})
+    authorized_client.headers["Authorization"] = f"Bearer {token}"
+    hits = response_cache.hits
+    assert voted("/posts/") == {**expected, test_post_ids[1]: False, test_post_ids[2]: True}
+    assert voted(f"/posts/{test_post_ids[1]}", lambda post: [post]) == {test_post_ids[1]: False}
+    assert response_cache.hits == hits + 2
+
+# GET /posts/batch
+def test_get_posts_batch(authorized_client, test_post_ids, query_stats):
+    """A bulk read keeps the requested order, lists missing ids and runs a single post query."""
+    authorized_client.get("/posts/", params={"limit": 0})  # warm the user cache
+    ids = [test_post_ids[2], 88888, test_post_ids[0], test_post_ids[2], 77777]
+    response = authorized_client.get("/posts/batch", params={"ids": ids})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["server-timing"].endswith('desc="1 queries"')
+    batch = schemas.PostBatch(**response.json())
+    assert [post.Post.id for post in batch.items] == [test_post_ids[2], test_post_ids[0]]
+    assert batch.missing == [88888, 77777]
+
+@pytest.mark.parametrize("ids", [[], list(range(1, settings.post_batch_max_ids + 2))])
+def test_get_posts_batch_size_limits(authorized_client, ids):
+    """Empty and oversized batches are rejected."""
+    response = authorized_client.get("/posts/batch", params={"ids": ids})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+def test_get_posts_batch_id_out_of_range(authorized_client, test_post_ids):
+    """Ids beyond the integer column range are rejected before reaching the database."""
+    response = authorized_client.get("/posts/batch", params={"ids": [test_post_ids[0], 2**40]})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+def test_unauthorized_user_get_posts_batch(client, test_post_ids):
+    """Unauthorized user cannot retrieve posts in bulk."""
+    response = client.get("/posts/batch", params={"ids": test_post_ids})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_get_one_post_not_modified(authorized_client, test_post_ids):
+    """A matching If-None-Match returns 304 until the post changes."""
+    response = authorized_client.get(f"/posts/{test_post_ids[0]}")
+    etag = response.headers["etag"]
+    response = authorized_client.get(f"/posts/{test_post_ids[0]}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    authorized_client.post("/vote/", json={"post_id": test_post_ids[0], "dir": 1})
+    response = authorized_client.get(f"/posts/{test_post_ids[0]}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["votes"] == 1
+
+def test_cached_posts_invalidated_by_writes(authorized_client, test_post_ids):
+    """Cached listings and posts reflect updates, deletes and new posts."""
+    assert len(authorized_client.get("/posts/").json()) == len(test_post_ids)
+    assert authorized_client.get(f"/posts/{test_post_ids[0]}").json()["Post"]["title"] == "1st title"
+    data = {"title": "updated title", "content": "updated content", "published": True}
+    authorized_client.put(f"/posts/{test_post_ids[0]}", json=data)
+    assert authorized_client.get(f"/posts/{test_post_ids[0]}").json()["Post"]["title"] == "updated title"
+    authorized_client.delete(f"/posts/{test_post_ids[1]}")
+    authorized_client.post("/posts/", json={"title": "new title", "content": "new content"})
+    titles = {post["Post"]["title"] for post in authorized_client.get("/posts/").json()}
+    assert titles == {"updated title", "3rd title", "4th title", "new title"}
+
 # POST /posts
 @pytest.mark.parametrize(
     "title, content, published",
@@ -70,6 +311,48 @@ def test_unauthorized_user_create_post(client):
     response = client.post("/posts/", json=payload)
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+# POST /posts/bulk
+def test_create_posts_bulk(authorized_client, test_user_1, query_stats):
+    """A bulk creation inserts the valid items in request order in one query and reports the rest by index."""
+    authorized_client.get("/posts/", params={"limit": 0})  # warm the user cache
+    payload = [
+        {"title": "bulk 1", "content": "content 1"},
+        {"title": "bulk 2"},
+        {"title": "bulk 3", "content": "content 3", "published": False},
+        "not a post",
+        {"title": "bulk 4", "content": "content 4"},
+    ]
+    response = authorized_client.post("/posts/bulk", json=payload)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.headers["server-timing"].endswith('desc="1 queries"')
+    result = schemas.PostBulkResult(**response.json())
+    assert [post.title for post in result.created] == ["bulk 1", "bulk 3", "bulk 4"]
+    assert [post.published for post in result.created] == [True, False, True]
+    assert {post.owner.email for post in result.created} == {test_user_1["email"]}
+    assert [error.index for error in result.errors] == [1, 3]
+    assert result.errors[0].detail[0]["loc"] == ["content"]
+    titles = {post["Post"]["title"] for post in authorized_client.get("/posts/", params={"limit": 10}).json()}
+    assert titles == {"bulk 1", "bulk 3", "bulk 4"}
+
+def test_create_posts_bulk_all_invalid(authorized_client):
+    """A bulk creation without a single valid item creates nothing."""
+    response = authorized_client.post("/posts/bulk", json=[{"title": "no content"}, {"content": "no title"}])
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    result = schemas.PostBulkResult(**response.json())
+    assert result.created == [] and [error.index for error in result.errors] == [0, 1]
+    assert authorized_client.get("/posts/").json() == []
+
+@pytest.mark.parametrize("payload", [[], [{"title": "t", "content": "c"}] * (settings.post_bulk_max_items + 1)])
+def test_create_posts_bulk_size_limits(authorized_client, payload):
+    """Empty and oversized bulk creations are rejected."""
+    response = authorized_client.post("/posts/bulk", json=payload)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+def test_unauthorized_user_create_posts_bulk(client):
+    """Unauthorized user cannot create posts in bulk."""
+    response = client.post("/posts/bulk", json=[{"title": "title", "content": "content"}])
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
 # DELETE /posts
 def test_delete_post_success(authorized_client, test_post_ids):
     """Authorized user can delete their own post."""
@@ -0,0 +1,38 @@
+from fastapi import status
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+import logging
+import pytest
+import re
+
+def test_server_timing_reports_request_queries(authorized_client, test_post_ids, query_stats):
+    """Each response reports the statements it ran and their total duration."""
+    response = authorized_client.get(f"/posts/{test_post_ids[0]}")
+    assert response.status_code == status.HTTP_200_OK
+    # One statement loads the current user, one the post
+    assert re.fullmatch(r'db;dur=\d+\.\d{3};desc="2 queries"', response.headers["server-timing"])
+    # The post is now served from the response cache
+    response = authorized_client.get(f"/posts/{test_post_ids[0]}")
+    assert response.headers["server-timing"].endswith('desc="0 queries"')
+
+def test_slow_queries_logged_with_route(authorized_client, test_post_ids, query_stats, monkeypatch, caplog):
+    """Statements above the threshold are logged with the route template."""
+    monkeypatch.setattr(query_stats, "slow_query_seconds", 0)
+    with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+        authorized_client.get(f"/posts/{test_post_ids[0]}")
+    assert any("on /posts/{id}: SELECT" in record.getMessage() for record in caplog.records)
+
+def test_query_stats_disabled(authorized_client, test_post_ids):
+    """Without instrumentation no Server-Timing header is added."""
+    response = authorized_client.get(f"/posts/{test_post_ids[0]}")
+    assert "server-timing" not in response.headers
+
+def test_failed_statement_leaves_no_start_time(session, query_stats):
+    """A statement that errors does not leave its start time on the pooled connection."""
+    with session.get_bind().connect() as conn:
+        with pytest.raises(DBAPIError):
+            conn.execute(text("SELECT 1 / 0"))
+        conn.rollback()
+        assert conn.info["query_start"] == []
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_start"] == []
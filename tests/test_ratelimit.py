@@ -0,0 +1,142 @@
+from app import main
+from app.config import configure, settings
+from app.main import create_app
+from app.oauth2 import create_access_token
+from app.ratelimit import (
+    configured_policies,
+    MemoryRateLimiter,
+    parse_rate,
+    Policy,
+    Rate,
+    RateLimitMiddleware,
+    RedisRateLimiter,
+)
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+import asyncio
+import pytest
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("10/minute", Rate(10, 60.0)), ("5/second", Rate(5, 1.0)), (" 2 / hour", Rate(2, 3600.0)), ("", None)],
+)
+def test_parse_rate(value, expected):
+    """Rates read "<count>/<unit>"; an empty setting disables the policy."""
+    assert parse_rate(value) == expected
+
+@pytest.mark.parametrize("value", ["10", "10/day", "ten/minute", "0/second"])
+def test_parse_rate_invalid(value):
+    """Malformed rates are rejected at startup."""
+    with pytest.raises(ValueError):
+        parse_rate(value)
+
+def test_memory_rate_limiter_gcra():
+    """A full bucket allows `limit` requests at once, then one per `period / limit` seconds."""
+    now = [1000.0]
+    limiter = MemoryRateLimiter(maxsize=10, clock=lambda: now[0])
+    rate = Rate(3, 3.0)
+
+    async def hits(count):
+        return [await limiter.hit("client", rate) for _ in range(count)]
+
+    assert asyncio.run(hits(4)) == [0, 0, 0, pytest.approx(1.0)]
+    now[0] += 0.5
+    assert asyncio.run(hits(1)) == [pytest.approx(0.5)]
+    now[0] += 0.5
+    assert asyncio.run(hits(2)) == [0, pytest.approx(1.0)]
+    # Other clients have their own bucket
+    assert asyncio.run(limiter.hit("other", rate)) == 0
+
+def test_memory_rate_limiter_evicts_least_recently_allowed():
+    """Tracked clients are bounded; evicted clients start over with a full bucket."""
+    limiter = MemoryRateLimiter(maxsize=2, clock=lambda: 0.0)
+    rate = Rate(1, 60.0)
+
+    async def run():
+        results = [await limiter.hit(key, rate) for key in ("a", "b", "a", "c")]
+        return results, list(limiter._tats)
+
+    results, tracked = asyncio.run(run())
+    assert results[:2] == [0, 0] and results[2] > 0 and results[3] == 0
+    assert tracked == ["a", "c"]
+
+def test_redis_rate_limiter_gcra():
+    """The shared limiter applies the same algorithm in one atomic script call."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    limiter = RedisRateLimiter(fakeredis.FakeAsyncRedis())
+    rate = Rate(2, 60.0)
+
+    async def run():
+        results = [await limiter.hit("client", rate) for _ in range(3)]
+        results.append(await limiter.hit("other", rate))
+        await limiter.clear()
+        results.append(await limiter.hit("client", rate))
+        return results
+
+    first, second, rejected, other, after_clear = asyncio.run(run())
+    assert first == second == other == after_clear == 0
+    assert 29 < rejected <= 30
+
+def _limited_client(policy: Policy) -> TestClient:
+    """A minimal app behind the rate limit middleware with a single policy."""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=MemoryRateLimiter(maxsize=100), policies=[policy])
+
+    @app.get("/posts/")
+    async def posts():
+        return []
+
+    return TestClient(app)
+
+def test_rate_limit_keyed_on_user():
+    """Policies count each token's user separately, and only requests with the policy's query parameter."""
+    client = _limited_client(Policy("search", "GET", ("/posts/",), Rate(1, 60.0), "user", query_param="search"))
+    alice = {"Authorization": f"Bearer {create_access_token({'user_id': 1})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'user_id': 2})}"}
+    assert client.get("/posts/", params={"search": "a"}, headers=alice).status_code == status.HTTP_200_OK
+    response = client.get("/posts/", params={"search": "a"}, headers=alice)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["retry-after"] == "60"
+    assert client.get("/posts/", params={"search": "a"}, headers=bob).status_code == status.HTTP_200_OK
+    assert client.get("/posts/", params={"search": ""}, headers=alice).status_code == status.HTTP_200_OK
+    assert client.get("/posts/", headers=alice).status_code == status.HTTP_200_OK
+
+def test_rate_limit_falls_back_to_ip_without_valid_token():
+    """Requests without a valid token are counted against the client IP."""
+    client = _limited_client(Policy("search", "GET", ("/posts/",), Rate(1, 60.0), "user"))
+    assert client.get("/posts/", headers={"Authorization": "Bearer invalid"}).status_code == status.HTTP_200_OK
+    assert client.get("/posts/").status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+def test_login_rate_limited_per_ip(client, test_user_1):
+    """Once enabled, login attempts beyond RATE_LIMIT_LOGIN answer 429 with Retry-After, before any password check."""
+    assert "login" not in {policy.name for policy in configured_policies()}
+    original = settings.model_copy()
+    try:
+        app = create_app(settings.model_copy(update={"rate_limit_login": "3/minute"}))
+        app.dependency_overrides.update(main.app.dependency_overrides)
+        limited = TestClient(app)
+        credentials = {"username": test_user_1["email"], "password": "wrong password"}
+        codes = {limited.post("/login", data=credentials).status_code for _ in range(3)}
+        assert status.HTTP_429_TOO_MANY_REQUESTS not in codes
+        response = limited.post("/login", data=credentials)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response.headers["retry-after"]) >= 1
+        assert 'chirp_rate_limited_total{policy="login"}' in limited.get("/metrics").text
+    finally:
+        configure(original)
+
+def test_feed_search_rate_limited(authorized_client, test_post_ids):
+    """Searching the feed counts against RATE_LIMIT_SEARCH like searching the listing."""
+    original = settings.model_copy()
+    try:
+        app = create_app(settings.model_copy(update={"rate_limit_search": "2/minute"}))
+        app.dependency_overrides.update(main.app.dependency_overrides)
+        limited = TestClient(app, headers=authorized_client.headers)
+        assert limited.get("/posts/", params={"search": "title"}).status_code == status.HTTP_200_OK
+        assert limited.get("/posts/feed", params={"search": "title"}).status_code == status.HTTP_200_OK
+        response = limited.get("/posts/feed", params={"search": "title"})
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert limited.get("/posts/feed").status_code == status.HTTP_200_OK
+    finally:
+        configure(original)
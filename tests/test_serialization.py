@@ -0,0 +1,42 @@
+from app import models, schemas
+from app.serialization import dump_post_out_list, load_owner, select_post_out
+from pydantic import TypeAdapter
+from sqlalchemy import event, select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import joinedload
+from typing import List
+import json
+import pytest
+
+def test_post_out_rows_match_response_model(session, test_user_1, test_post_ids):
+    """Column rows serialize to exactly what the PostOut response model produces."""
+    session.add(models.Vote(user_id=test_user_1["id"], post_id=test_post_ids[1]))
+    session.commit()
+    query = (
+        select(
+            models.Post,
+            models.Post.vote_count.label("votes"),
+            models.Post.id.in_(select(models.Vote.post_id).where(models.Vote.user_id == test_user_1["id"])).label("voted_by_me"),
+        )
+        .options(joinedload(models.Post.owner))
+        .order_by(models.Post.id)
+    )
+    adapter = TypeAdapter(List[schemas.PostOut])
+    expected = adapter.dump_json(adapter.validate_python(session.execute(query).all(), from_attributes=True))
+    fast = dump_post_out_list(session.execute(select_post_out(test_user_1["id"]).order_by(models.Post.id)).all())
+    assert fast == expected
+    assert [post["voted_by_me"] for post in json.loads(fast)] == [False, True, False, False]
+
+@pytest.mark.parametrize("strategy, queries", [("joined", 1), ("selectin", 2)])
+def test_load_owner(session, test_post_ids, strategy, queries):
+    """Owners load in a fixed number of queries and never lazily, one post at a time."""
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    posts = session.scalars(select(models.Post).options(load_owner(strategy))).unique().all()
+    assert {post.owner.email for post in posts} == {"test_user_1@gmail.com", "test_user_2@gmail.com"}
+    assert len(statements) == queries
+    assert all("password" not in statement for statement in statements)
+    session.expunge_all()
+    post = session.scalars(select(models.Post)).first()
+    with pytest.raises(InvalidRequestError):
+        post.owner
@@ -33,4 +33,10 @@ def test_create_user_missing_password(client):
     """Creating a user without a password returns 422."""
     payload = {"email": "valid@gmail.com"}
     response = client.post("/users/", json=payload)
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
\ No newline at end of file
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+# GET /users/{id}
+def test_get_user_id_out_of_range(client):
+    """Ids beyond the integer column range are rejected before reaching the database."""
+    response = client.get(f"/users/{2**40}")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
@@ -1,5 +1,13 @@
-from app import schemas
+from app import models, schemas
+from app.config import settings
+from app.database import SyncSessionAdapter
+from app.ranking import hot_score
+from app.votes import record_vote, record_votes, VoteBuffer, VoteOp
 from fastapi import status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+import asyncio
+import pytest
 
 # VOTE /vote
 def test_vote_up_for_unvoted_post(authorized_client, test_post_ids):
@@ -66,4 +74,135 @@ def test_vote_for_post_not_exist(authorized_client):
     payload = {"post_id": 88888, "dir": schemas.VoteDir.UP}
     res = authorized_client.post("/vote/", json=payload)
     assert res.status_code == status.HTTP_404_NOT_FOUND
-    assert res.json().get("detail") == f"Post with id: 88888 does not exist"
\ No newline at end of file
+    assert res.json().get("detail") == f"Post with id: 88888 does not exist"
+
+def test_concurrent_duplicate_votes(session, test_post_ids, test_user_1):
+    """Racing upvotes of the same user yield one vote and one 409, never an error."""
+    op = VoteOp(test_user_1["id"], test_post_ids[0], schemas.VoteDir.UP)
+
+    async def vote_once():
+        db = SyncSessionAdapter(Session(bind=session.get_bind(), expire_on_commit=False))
+        try:
+            return await record_vote(db, op)
+        finally:
+            await db.close()
+
+    async def run():
+        return await asyncio.gather(*(vote_once() for _ in range(4)))
+
+    status_codes = sorted(status_code for status_code, _ in asyncio.run(run()))
+    assert status_codes == [200, 409, 409, 409]
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_votes_maintain_rankings(session, test_post_ids, test_user_1, test_user_2, batch):
+    """Single and batched votes keep hot scores and hourly vote buckets in step with the votes."""
+    db = SyncSessionAdapter(session)
+    ops = [
+        VoteOp(test_user_1["id"], test_post_ids[0], schemas.VoteDir.UP),
+        VoteOp(test_user_2["id"], test_post_ids[0], schemas.VoteDir.UP),
+        VoteOp(test_user_1["id"], test_post_ids[1], schemas.VoteDir.UP),
+        VoteOp(test_user_1["id"], test_post_ids[1], schemas.VoteDir.DOWN),
+    ]
+
+    async def run():
+        if batch:
+            return await record_votes(db, ops)
+        return [await record_vote(db, op) for op in ops]
+
+    assert [status_code for status_code, _ in asyncio.run(run())] == [200, 200, 200, 200]
+    buckets = session.execute(
+        select(models.PostVoteHour.post_id, func.sum(models.PostVoteHour.votes)).group_by(models.PostVoteHour.post_id)
+    ).all()
+    assert {post_id: votes for post_id, votes in buckets if votes} == {test_post_ids[0]: 2}
+    scores = session.execute(
+        select(models.Post.id, models.Post.hot_score, hot_score(models.Post.vote_count, models.Post.created_at))
+    ).all()
+    assert all(stored == pytest.approx(expected) for _, stored, expected in scores)
+    ranked = session.scalars(select(models.Post.id).order_by(models.Post.hot_score.desc(), models.Post.id.desc()))
+    assert ranked.first() == test_post_ids[0]
+
+# VOTE /vote/batch
+def test_vote_batch(authorized_client, test_post_ids, test_user_1):
+    """A batch reports the single-vote outcome of every operation, in order."""
+    authorized_client.post("/vote/", json={"post_id": test_post_ids[1], "dir": schemas.VoteDir.UP})
+    votes = [
+        {"post_id": test_post_ids[0], "dir": schemas.VoteDir.UP},
+        {"post_id": test_post_ids[1], "dir": schemas.VoteDir.UP},
+        {"post_id": test_post_ids[2], "dir": schemas.VoteDir.DOWN},
+        {"post_id": 88888, "dir": schemas.VoteDir.UP},
+        {"post_id": test_post_ids[3], "dir": schemas.VoteDir.UP},
+        {"post_id": test_post_ids[3], "dir": schemas.VoteDir.DOWN},
+        {"post_id": test_post_ids[3], "dir": schemas.VoteDir.UP},
+    ]
+    res = authorized_client.post("/vote/batch", json={"votes": votes})
+    assert res.status_code == status.HTTP_200_OK
+    results = res.json()["results"]
+    assert [result["status_code"] for result in results] == [200, 409, 404, 404, 200, 200, 200]
+    assert results[1]["detail"] == f"User {test_user_1['id']} has already voted on post {test_post_ids[1]}"
+    assert results[2]["detail"] == "Vote does not exist"
+    assert results[3]["detail"] == "Post with id: 88888 does not exist"
+    votes = [schemas.PostOut(**authorized_client.get(f"/posts/{id}").json()).votes for id in test_post_ids]
+    assert votes == [1, 1, 0, 1]
+
+def test_vote_batch_empty(authorized_client):
+    """An empty batch is rejected."""
+    res = authorized_client.post("/vote/batch", json={"votes": []})
+    assert res.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+@pytest.mark.parametrize("path, payload", [
+    ("/vote/", {"post_id": 2**40, "dir": 1}),
+    ("/vote/batch", {"votes": [{"post_id": 2**40, "dir": 1}]}),
+])
+def test_vote_post_id_out_of_range(authorized_client, path, payload):
+    """Post ids beyond the integer column range are rejected before reaching the database."""
+    res = authorized_client.post(path, json=payload)
+    assert res.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+# Write-behind voting
+def test_vote_write_behind(authorized_client, test_post_ids, monkeypatch):
+    """Buffered single votes keep the regular responses."""
+    monkeypatch.setattr(settings, "vote_write_behind", True)
+    payload = {"post_id": test_post_ids[0], "dir": schemas.VoteDir.UP}
+    res = authorized_client.post("/vote/", json=payload)
+    assert res.json().get("message") == "Successfully added vote"
+    res = authorized_client.post("/vote/", json=payload)
+    assert res.status_code == status.HTTP_409_CONFLICT
+    res = authorized_client.post("/vote/", json={"post_id": 88888, "dir": schemas.VoteDir.UP})
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+    assert schemas.PostOut(**authorized_client.get(f"/posts/{test_post_ids[0]}").json()).votes == 1
+
+def test_vote_buffer_groups_concurrent_votes(session, test_post_ids, test_user_1):
+    """Concurrent votes are written as one batch, each caller getting its own outcome."""
+    buffer = VoteBuffer(window=0.05, max_size=100)
+    db = SyncSessionAdapter(session)
+    ops = [
+        VoteOp(test_user_1["id"], test_post_ids[0], schemas.VoteDir.UP),
+        VoteOp(test_user_1["id"], test_post_ids[0], schemas.VoteDir.UP),
+        VoteOp(test_user_1["id"], 88888, schemas.VoteDir.UP),
+        VoteOp(test_user_1["id"], test_post_ids[1], schemas.VoteDir.DOWN),
+    ]
+
+    async def run():
+        return await asyncio.gather(*(buffer.submit(db, op) for op in ops))
+
+    outcomes = asyncio.run(run())
+    assert [status_code for status_code, _ in outcomes] == [200, 409, 404, 404]
+
+def test_vote_buffer_leader_cancelled(session, test_post_ids, test_user_1, test_user_2):
+    """Cancelling the caller that leads a batch neither cancels nor fails the other votes of the batch."""
+    buffer = VoteBuffer(window=0.05, max_size=100)
+    db = SyncSessionAdapter(session)
+
+    async def run():
+        leader = asyncio.create_task(buffer.submit(db, VoteOp(test_user_1["id"], test_post_ids[0], schemas.VoteDir.UP)))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(buffer.submit(db, VoteOp(test_user_2["id"], test_post_ids[0], schemas.VoteDir.UP)))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    status_code, _ = asyncio.run(run())
+    assert status_code == 200
+    assert session.query(models.Post.vote_count).filter(models.Post.id == test_post_ids[0]).scalar() == 2